@@ -4,10 +4,16 @@ import time
 import uuid
 import mediapipe as mp
 
+from sample_writer import SampleWriter
+from shard_store import ShardWriter
+from near_duplicates import DuplicateFilter
+
 # === Folder Setup ===
 BASE_PATH = 'datasets/train'
 IMG_PATH = os.path.join(BASE_PATH, 'images')
 LABEL_PATH = os.path.join(BASE_PATH, 'labels')
+SHARD_PATH = os.path.join(BASE_PATH, 'shards')
+USE_SHARDS = False  # Append samples to packed shards instead of loose image/label files
 
 os.makedirs(IMG_PATH, exist_ok=True)
 os.makedirs(LABEL_PATH, exist_ok=True)
@@ -23,19 +29,36 @@ hands = mp_hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_c
 # === Number of images to collect per class ===
 number_of_images = 20
 
+# === Samples saved per second while a hand is visible (replaces the fixed sleep) ===
+capture_rate = 2.0
+
+# === Frames whose hand crop repeats an earlier sample of the label are skipped ===
+dedup = DuplicateFilter(max_distance=6)
+
+# === Encoding and disk writes happen on background threads ===
+writer = SampleWriter(IMG_PATH, LABEL_PATH, workers=4, max_pending=64,
+                      store=ShardWriter(SHARD_PATH) if USE_SHARDS else None)
+
 for label in labels:
     cap = cv2.VideoCapture(0)
     print(f'Collecting images for {label}')
     time.sleep(5)
 
-    for img_num in range(number_of_images):
+    img_num = 0
+    last_saved = 0.0
+    while img_num < number_of_images:
         ret, frame = cap.read()
+        if not ret:
+            break
         h, w, _ = frame.shape
 
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         results = hands.process(rgb)
 
         if results.multi_hand_landmarks:
+            # Keep an undrawn copy for the dataset; the writer owns it from here on
+            clean_frame = frame.copy()
+            label_lines = []
             for hand_landmarks in results.multi_hand_landmarks:
                 x_coords = [lm.x for lm in hand_landmarks.landmark]
                 y_coords = [lm.y for lm in hand_landmarks.landmark]
@@ -52,30 +75,31 @@ for label in labels:
                 x_max = min(w, x_max + margin)
                 y_max = min(h, y_max + margin)
 
-                # Save image
-                img_id = str(uuid.uuid1())
-                img_filename = os.path.join(IMG_PATH, f"{label}_{img_id}.jpg")
-                cv2.imwrite(img_filename, frame)
-
                 # YOLO normalized format
                 x_center = ((x_min + x_max) / 2) / w
                 y_center = ((y_min + y_max) / 2) / h
                 bbox_width = (x_max - x_min) / w
                 bbox_height = (y_max - y_min) / h
-
-                # Save label
-                label_filename = os.path.join(LABEL_PATH, f"{label}_{img_id}.txt")
-                with open(label_filename, 'w') as f:
-                    f.write(f"{label_map[label]} {x_center:.6f} {y_center:.6f} {bbox_width:.6f} {bbox_height:.6f}")
+                label_lines.append(f"{label_map[label]} {x_center:.6f} {y_center:.6f} {bbox_width:.6f} {bbox_height:.6f}")
 
                 cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), (0, 255, 0), 2)
                 cv2.putText(frame, label, (x_min, y_min - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 0, 0), 2)
 
+            now = time.time()
+            if now - last_saved >= 1.0 / capture_rate and dedup.check(label, clean_frame, (x_min, y_min, x_max, y_max)):
+                img_id = str(uuid.uuid1())
+                writer.submit(f"{label}_{img_id}", clean_frame, label_lines)
+                last_saved = now
+                img_num += 1
+
         cv2.imshow('Frame', frame)
-        time.sleep(1.5)
 
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
     cap.release()
     cv2.destroyAllWindows()
+
+writer.close()
+print(writer.summary())
+print(dedup.summary())
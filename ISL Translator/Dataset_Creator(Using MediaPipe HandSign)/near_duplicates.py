@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from multiprocessing import Pool
+
+import cv2
+import numpy as np
+
+# === Near-duplicate filtering ===
+# Frames are compared by a 64-bit perceptual hash of the hand crop, so a
+# changing background or a slightly different hand position does not make
+# a repeated pose look new. HashIndex answers "is anything within N bits?"
+# through a multi-index: hashes within N bits agree exactly on at least one of
+# N + 1 bands, so a lookup only compares against the few entries sharing a
+# band instead of the whole index.
+#
+# Offline, over a collected folder (split-aware when dataset/splits.jsonl exists):
+#
+#     python near_duplicates.py datasets/train --action move
+
+DEFAULT_DISTANCE = 6  # Max differing bits for two hand crops to count as the same sample
+SPLIT_ORDER = ['train', 'val', 'test']
+
+
+def dhash(gray):
+    # 64-bit difference hash of a grayscale image
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def phash(gray):
+    # 64-bit DCT hash; slower than dHash but steadier under lighting changes
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8]
+    bits = low > np.median(low)
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+HASHES = {'dhash': dhash, 'phash': phash}
+
+
+def crop_hash(frame, box, method='dhash'):
+    # Hash of the (x1, y1, x2, y2) pixel region of a BGR frame
+    x1, y1, x2, y2 = (int(v) for v in box)
+    crop = frame[max(0, y1):y2, max(0, x1):x2]
+    if crop.size == 0:
+        crop = frame
+    return HASHES[method](cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY))
+
+
+def label_box(label_text, width, height):
+    # Pixel box and class of the first valid YOLO line, or (None, None);
+    # malformed lines are skipped like validate_dataset.check_label does
+    for line in label_text.splitlines():
+        parts = line.split()
+        if len(parts) != 5:
+            continue
+        try:
+            cls = int(parts[0])
+            x, y, w, h = (float(v) for v in parts[1:])
+        except ValueError:
+            continue
+        return cls, ((x - w / 2) * width, (y - h / 2) * height, (x + w / 2) * width, (y + h / 2) * height)
+    return None, None
+
+
+class HashIndex:
+    def __init__(self, max_distance=DEFAULT_DISTANCE):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        bounds = [64 * band // bands for band in range(bands + 1)]
+        self._masks = [((1 << (bounds[band + 1] - bounds[band])) - 1) << bounds[band] for band in range(bands)]
+        self._tables = [{} for _ in self._masks]
+        self._entries = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, value, key=None, tag=None):
+        index = len(self._entries)
+        self._entries.append((value, key, tag))
+        for mask, table in zip(self._masks, self._tables):
+            table.setdefault(value & mask, []).append(index)
+
+    def query(self, value):
+        # (distance, key, tag) of the closest entry within max_distance, or None
+        best = None
+        for mask, table in zip(self._masks, self._tables):
+            for index in table.get(value & mask, ()):
+                other, key, tag = self._entries[index]
+                distance = bin(value ^ other).count('1')
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, key, tag)
+                    if distance == 0:
+                        return best
+        return best
+
+    def matches(self, value):
+        # (distance, key, tag) of every entry within max_distance
+        seen, found = set(), []
+        for mask, table in zip(self._masks, self._tables):
+            for index in table.get(value & mask, ()):
+                if index in seen:
+                    continue
+                seen.add(index)
+                other, key, tag = self._entries[index]
+                distance = bin(value ^ other).count('1')
+                if distance <= self.max_distance:
+                    found.append((distance, key, tag))
+        return found
+
+
+class DuplicateFilter:
+    # Online accept/reject for the collectors: one index per label, since the
+    # same hand shape under two labels is not a duplicate
+
+    def __init__(self, max_distance=DEFAULT_DISTANCE, method='dhash'):
+        self.max_distance = max_distance
+        self.method = method
+        self.indexes = {}
+        self.accepted = 0
+        self.rejected = 0
+        self.seconds = 0.0
+
+    def check(self, label, frame, box, key=None):
+        # True (and remembered) if the crop is new for this label
+        started = time.perf_counter()
+        value = crop_hash(frame, box, self.method)
+        index = self.indexes.setdefault(label, HashIndex(self.max_distance))
+        is_new = index.query(value) is None
+        if is_new:
+            index.add(value, key)
+            self.accepted += 1
+        else:
+            self.rejected += 1
+        self.seconds += time.perf_counter() - started
+        return is_new
+
+    def summary(self):
+        checks = self.accepted + self.rejected
+        mean_ms = self.seconds / checks * 1000 if checks else 0.0
+        return f"Kept {self.accepted}, skipped {self.rejected} near-duplicates ({mean_ms:.2f} ms per check)"
+
+
+def _hash_sample(task):
+    # Runs in a worker: (key, cls, hash) for one image/label pair
+    key, image_path, label_path, method = task
+    frame = cv2.imread(image_path)
+    if frame is None or not os.path.exists(label_path):
+        return key, None, None
+    try:
+        with open(label_path, encoding='utf-8') as f:
+            label_text = f.read()
+    except (OSError, UnicodeDecodeError):
+        return key, None, None
+    cls, box = label_box(label_text, frame.shape[1], frame.shape[0])
+    if box is None:
+        return key, None, None
+    return key, cls, crop_hash(frame, box, method)
+
+
+def load_split_state(path):
+    splits = {}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                splits[entry['key']] = entry['split']
+    return splits
+
+
+def find_duplicates(root, splits, max_distance=DEFAULT_DISTANCE, method='dhash', workers=None):
+    # [(key, original_key, same_split)]. Samples are visited train -> val ->
+    # test -> unassigned, so the copy that is kept is always in the earliest
+    # split and a frame repeated in val/test (leakage) is the one flagged.
+    img_dir, label_dir = os.path.join(root, 'images'), os.path.join(root, 'labels')
+    tasks = [(os.path.splitext(name)[0], os.path.join(img_dir, name),
+              os.path.join(label_dir, os.path.splitext(name)[0] + '.txt'), method)
+             for name in sorted(os.listdir(img_dir)) if name.lower().endswith(('.jpg', '.jpeg', '.png'))]
+    with Pool(workers or os.cpu_count() or 1) as pool:
+        hashed = pool.map(_hash_sample, tasks, chunksize=64)
+
+    rank = {split: position for position, split in enumerate(SPLIT_ORDER)}
+    hashed.sort(key=lambda item: (rank.get(splits.get(item[0]), len(SPLIT_ORDER)), item[0]))
+    indexes, duplicates = {}, []
+    for key, cls, value in hashed:
+        if value is None:
+            continue
+        index = indexes.setdefault(cls, HashIndex(max_distance))
+        match = index.query(value)
+        if match is None:
+            index.add(value, key, splits.get(key))
+        else:
+            duplicates.append((key, match[1], splits.get(key) == match[2]))
+    return duplicates
+
+
+def remove_samples(root, keys, action):
+    img_dir, label_dir = os.path.join(root, 'images'), os.path.join(root, 'labels')
+    target = os.path.join(root, 'duplicates')
+    if action == 'move':
+        os.makedirs(os.path.join(target, 'images'), exist_ok=True)
+        os.makedirs(os.path.join(target, 'labels'), exist_ok=True)
+    names = {os.path.splitext(name)[0]: name for name in os.listdir(img_dir)}
+    for key in keys:
+        for directory, name, sub in ((img_dir, names.get(key), 'images'), (label_dir, key + '.txt', 'labels')):
+            path = os.path.join(directory, name) if name else None
+            if not path or not os.path.exists(path):
+                continue
+            if action == 'move':
+                shutil.move(path, os.path.join(target, sub, name))
+            else:
+                os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate hand samples in a collected dataset")
+    parser.add_argument('root', nargs='?', default='datasets/train', help="Folder containing images/ and labels/")
+    parser.add_argument('--splits', default='dataset/splits.jsonl', help="Split assignments from split_and_yaml.py")
+    parser.add_argument('--distance', type=int, default=DEFAULT_DISTANCE)
+    parser.add_argument('--method', choices=sorted(HASHES), default='dhash')
+    parser.add_argument('--action', choices=['report', 'move', 'delete'], default='report',
+                        help="move puts duplicates under <root>/duplicates/")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    splits = load_split_state(args.splits)
+    started = time.perf_counter()
+    duplicates = find_duplicates(args.root, splits, args.distance, args.method, args.workers)
+    cross = [item for item in duplicates if splits and not item[2]]
+    print(f"Found {len(duplicates)} near-duplicates in {time.perf_counter() - started:.1f}s"
+          + (f", {len(cross)} of them across splits" if splits else ""))
+    for key, original, _ in cross[:10]:
+        print(f"   {key} ({splits.get(key)}) repeats {original} ({splits.get(original)})")
+
+    if args.action != 'report' and duplicates:
+        remove_samples(args.root, [key for key, _, _ in duplicates], args.action)
+        print(f"✅ {'Moved' if args.action == 'move' else 'Deleted'} {len(duplicates)} samples; "
+              f"re-run split_and_yaml.py to update the manifests.")
+
+
+if __name__ == '__main__':
+    main()
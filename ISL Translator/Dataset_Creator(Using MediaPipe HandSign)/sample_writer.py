@@ -0,0 +1,107 @@
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+
+class SampleWriter:
+    # Writes image + YOLO label pairs on a pool of encoder threads so the capture
+    # loop never waits on JPEG encoding or disk. The queue is bounded: when the
+    # disk falls behind, submit() blocks (backpressure) instead of buffering
+    # frames without limit. Files are written under a .tmp name and renamed into
+    # place, image first and label last, so a crash never leaves a half-written
+    # file and a label always has its image. With a `store` (a ShardWriter),
+    # encoded samples are appended to packed shards instead of loose files.
+
+    def __init__(self, img_dir, label_dir, workers=4, max_pending=64, ext='.jpg', jpeg_quality=95, store=None):
+        self.img_dir = img_dir
+        self.label_dir = label_dir
+        self.ext = ext
+        self.store = store
+        self.encode_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality] if ext in ('.jpg', '.jpeg') else []
+        self.written = 0
+        self.errors = 0
+        self.bytes_written = 0
+        self.started_at = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        if store is None:
+            os.makedirs(img_dir, exist_ok=True)
+            os.makedirs(label_dir, exist_ok=True)
+            self._remove_partial_files()
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, name, frame, label_lines, timeout=None):
+        # `frame` must not be modified afterwards; pass a copy if it will be drawn on
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+        self._queue.put((name, frame, label_lines), timeout=timeout)
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        self.flush()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+        if self.store is not None:
+            self.store.close()
+
+    def rate(self):
+        if not self.started_at or not self.written:
+            return 0.0
+        return self.written / (time.perf_counter() - self.started_at)
+
+    def summary(self):
+        return f"Saved {self.written} samples ({self.errors} errors) at {self.rate():.1f} samples/s"
+
+    def _remove_partial_files(self):
+        # Leftovers from an interrupted run
+        for directory in (self.img_dir, self.label_dir):
+            for name in os.listdir(directory):
+                if name.endswith('.tmp'):
+                    os.remove(os.path.join(directory, name))
+
+    def _write_atomic(self, path, data):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            name, frame, label_lines = item
+            try:
+                ok, encoded = cv2.imencode(self.ext, frame, self.encode_params)
+                if not ok:
+                    raise ValueError(f"could not encode {name}")
+                image_bytes = encoded.tobytes()
+                label_bytes = '\n'.join(label_lines).encode('utf-8')
+                if self.store is not None:
+                    self.store.add(name, image_bytes, label_bytes, self.ext)
+                else:
+                    self._write_atomic(os.path.join(self.img_dir, name + self.ext), image_bytes)
+                    self._write_atomic(os.path.join(self.label_dir, name + '.txt'), label_bytes)
+                with self._lock:
+                    self.written += 1
+                    self.bytes_written += len(image_bytes) + len(label_bytes)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"❌ Failed to write sample {name}: {e}")
+            finally:
+                self._queue.task_done()
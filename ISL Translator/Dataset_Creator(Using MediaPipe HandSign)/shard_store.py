@@ -0,0 +1,294 @@
+import argparse
+import io
+import json
+import os
+import random
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+
+# === Layout ===
+# <root>/shard-000000.tar ...   WebDataset-style tar shards: <key>.jpg + <key>.txt per sample
+# <root>/index.jsonl             one line per sample: key, shard, byte offsets and sizes
+#
+# Samples are read back with a single positioned read per file from the offsets
+# in the index, so random access does not need to scan or extract the tar.
+
+INDEX_NAME = 'index.jsonl'
+
+
+class ShardWriter:
+    # Appends samples to the current shard and rolls over to a new one after
+    # `max_samples` or `max_bytes`. Each writer session starts a fresh shard so a
+    # previous run's file is never reopened. The index line is written after the
+    # sample's bytes are flushed, so an interrupted run only loses the sample in
+    # flight.
+
+    def __init__(self, root, max_samples=10000, max_bytes=1 << 30):
+        self.root = root
+        self.max_samples = max_samples
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = open(os.path.join(root, INDEX_NAME), 'a', encoding='utf-8')
+        self._shard_number = self._next_shard_number()
+        self._tar = None
+        self._shard_name = None
+        self._shard_samples = 0
+
+    def _next_shard_number(self):
+        numbers = [int(name[6:12]) for name in os.listdir(self.root)
+                   if name.startswith('shard-') and name.endswith('.tar')]
+        return max(numbers) + 1 if numbers else 0
+
+    def _open_shard(self):
+        self._shard_name = f"shard-{self._shard_number:06d}.tar"
+        self._shard_number += 1
+        self._tar = tarfile.open(os.path.join(self.root, self._shard_name), 'w', format=tarfile.USTAR_FORMAT)
+        self._shard_samples = 0
+
+    def _add_member(self, name, data):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        header = info.tobuf(self._tar.format, self._tar.encoding, self._tar.errors)
+        data_offset = self._tar.offset + len(header)
+        self._tar.addfile(info, io.BytesIO(data))
+        return [data_offset, len(data)]
+
+    def add(self, key, image_bytes, label_text, ext='.jpg'):
+        label_bytes = label_text.encode('utf-8') if isinstance(label_text, str) else label_text
+        with self._lock:
+            if (self._tar is None or self._shard_samples >= self.max_samples
+                    or self._tar.offset >= self.max_bytes):
+                if self._tar is not None:
+                    self._tar.close()
+                self._open_shard()
+            record = {
+                'key': key,
+                'shard': self._shard_name,
+                'ext': ext,
+                'image': self._add_member(key + ext, image_bytes),
+                'label': self._add_member(key + '.txt', label_bytes),
+            }
+            self._shard_samples += 1
+            self._tar.fileobj.flush()
+            self._index.write(json.dumps(record) + '\n')
+            self._index.flush()
+
+    def close(self):
+        with self._lock:
+            if self._tar is not None:
+                self._tar.close()
+                self._tar = None
+            self._index.close()
+
+
+class ShardReader:
+    # Random and sequential access to a shard store through its index
+
+    def __init__(self, root):
+        self.root = root
+        self.records = {}
+        with open(os.path.join(root, INDEX_NAME), encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line from an interrupted writer
+                self.records[record['key']] = record
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.records)
+
+    def keys(self):
+        return list(self.records)
+
+    def _file(self, shard):
+        with self._lock:
+            handle = self._files.get(shard)
+            if handle is None:
+                handle = self._files[shard] = open(os.path.join(self.root, shard), 'rb')
+            return handle
+
+    def _read(self, handle, offset, size):
+        if hasattr(os, 'pread'):
+            return os.pread(handle.fileno(), size, offset)
+        with self._lock:
+            handle.seek(offset)
+            return handle.read(size)
+
+    def read(self, key):
+        # (image_bytes, label_text, ext)
+        record = self.records[key]
+        handle = self._file(record['shard'])
+        image = self._read(handle, *record['image'])
+        label = self._read(handle, *record['label']).decode('utf-8')
+        return image, label, record['ext']
+
+    def read_label(self, key):
+        # Label text only, without reading the image
+        record = self.records[key]
+        return self._read(self._file(record['shard']), *record['label']).decode('utf-8')
+
+    def iter_samples(self, keys=None):
+        # Sequential order by shard and offset, for the fastest full passes
+        records = [self.records[key] for key in keys] if keys is not None else list(self.records.values())
+        records.sort(key=lambda record: (record['shard'], record['image'][0]))
+        for record in records:
+            yield (record['key'],) + self.read(record['key'])
+
+    def close(self):
+        with self._lock:
+            for handle in self._files.values():
+                handle.close()
+            self._files = {}
+
+
+def read_keys(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def export_yolo(reader, out_dir, keys=None):
+    # Materialize the Ultralytics images/ + labels/ layout for (a subset of) the store
+    img_dir = os.path.join(out_dir, 'images')
+    label_dir = os.path.join(out_dir, 'labels')
+    os.makedirs(img_dir, exist_ok=True)
+    os.makedirs(label_dir, exist_ok=True)
+    count = 0
+    for key, image, label, ext in reader.iter_samples(keys):
+        with open(os.path.join(img_dir, key + ext), 'wb') as f:
+            f.write(image)
+        with open(os.path.join(label_dir, key + '.txt'), 'w', encoding='utf-8') as f:
+            f.write(label)
+        count += 1
+    return count
+
+
+def pack_folder(img_dir, label_dir, root, max_samples=10000):
+    # Convert an existing images/ + labels/ tree into shards
+    writer = ShardWriter(root, max_samples=max_samples)
+    count = 0
+    try:
+        for name in sorted(os.listdir(img_dir)):
+            key, ext = os.path.splitext(name)
+            label_path = os.path.join(label_dir, key + '.txt')
+            if not os.path.exists(label_path):
+                print(f"⚠️ Skipping {name}: no label file")
+                continue
+            with open(os.path.join(img_dir, name), 'rb') as f:
+                image = f.read()
+            with open(label_path, encoding='utf-8') as f:
+                label = f.read()
+            writer.add(key, image, label, ext)
+            count += 1
+    finally:
+        writer.close()
+    return count
+
+
+def benchmark(samples=2000, image_size=30000, reads=2000):
+    # Synthetic comparison of the folder layout against shards
+    work = tempfile.mkdtemp(prefix='shard_bench_')
+    payloads = [(f"Hello_{i:07d}", os.urandom(image_size), "0 0.5 0.5 0.2 0.3") for i in range(samples)]
+    results = {}
+    try:
+        img_dir, label_dir = os.path.join(work, 'images'), os.path.join(work, 'labels')
+        os.makedirs(img_dir)
+        os.makedirs(label_dir)
+        start = time.perf_counter()
+        for key, image, label in payloads:
+            with open(os.path.join(img_dir, key + '.jpg'), 'wb') as f:
+                f.write(image)
+            with open(os.path.join(label_dir, key + '.txt'), 'w') as f:
+                f.write(label)
+        results['folder_write'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        writer = ShardWriter(os.path.join(work, 'shards'), max_samples=1000)
+        for key, image, label in payloads:
+            writer.add(key, image, label)
+        writer.close()
+        results['shard_write'] = time.perf_counter() - start
+
+        # Split: copying every pair (current splitter) vs writing key manifests
+        split_dir = os.path.join(work, 'split')
+        os.makedirs(os.path.join(split_dir, 'images'))
+        os.makedirs(os.path.join(split_dir, 'labels'))
+        start = time.perf_counter()
+        for key, _, _ in payloads:
+            shutil.copy2(os.path.join(img_dir, key + '.jpg'), os.path.join(split_dir, 'images', key + '.jpg'))
+            shutil.copy2(os.path.join(label_dir, key + '.txt'), os.path.join(split_dir, 'labels', key + '.txt'))
+        results['folder_split'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reader = ShardReader(os.path.join(work, 'shards'))
+        with open(os.path.join(work, 'train.keys'), 'w') as f:
+            f.write('\n'.join(reader.keys()))
+        results['shard_split'] = time.perf_counter() - start
+
+        order = [random.choice(payloads)[0] for _ in range(reads)]
+        start = time.perf_counter()
+        for key in order:
+            with open(os.path.join(img_dir, key + '.jpg'), 'rb') as f:
+                f.read()
+            with open(os.path.join(label_dir, key + '.txt')) as f:
+                f.read()
+        results['folder_random_read'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for key in order:
+            reader.read(key)
+        results['shard_random_read'] = time.perf_counter() - start
+        reader.close()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    for name, seconds in results.items():
+        count = reads if name.endswith('read') else samples
+        print(f"{name:20s} {count / seconds:10.0f} samples/s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Packed shard store for collected ISL samples")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    pack = commands.add_parser('pack', help="Convert an images/ + labels/ folder into shards")
+    pack.add_argument('--images', default='datasets/train/images')
+    pack.add_argument('--labels', default='datasets/train/labels')
+    pack.add_argument('--shards', default='datasets/train/shards')
+    pack.add_argument('--max-samples', type=int, default=10000)
+
+    export = commands.add_parser('export', help="Materialize the Ultralytics folder layout")
+    export.add_argument('--shards', default='datasets/train/shards')
+    export.add_argument('--keys', help="Only export the keys listed in this file (e.g. a split manifest)")
+    export.add_argument('--out', required=True)
+
+    bench = commands.add_parser('bench', help="Compare folder and shard throughput on synthetic samples")
+    bench.add_argument('--samples', type=int, default=2000)
+    bench.add_argument('--image-size', type=int, default=30000)
+
+    args = parser.parse_args()
+    if args.command == 'pack':
+        count = pack_folder(args.images, args.labels, args.shards, args.max_samples)
+        print(f"✅ Packed {count} samples into {args.shards}")
+    elif args.command == 'export':
+        reader = ShardReader(args.shards)
+        count = export_yolo(reader, args.out, read_keys(args.keys) if args.keys else None)
+        reader.close()
+        print(f"✅ Exported {count} samples to {args.out}")
+    else:
+        benchmark(args.samples, args.image_size, reads=args.samples)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,21 @@
 import os
-import shutil
-import random
+import json
+import hashlib
 import yaml
 
+from shard_store import INDEX_NAME, ShardReader, export_yolo
+from validate_dataset import check_label, invalid_keys
+
 # === Paths ===
 BASE = 'datasets/train'
 IMG_DIR = os.path.join(BASE, 'images')
 LABEL_DIR = os.path.join(BASE, 'labels')
+SHARD_DIR = os.path.join(BASE, 'shards')
 OUTPUT_BASE = 'dataset'  # changed from datasets_split
+STATE_FILE = os.path.join(OUTPUT_BASE, 'splits.jsonl')  # key, split and class of every assigned sample
+INVALID_FILE = os.path.join(OUTPUT_BASE, 'invalid.jsonl')  # Shard samples rejected by validation
+EXPORT_SHARDS = True  # Materialize split folders from the shard manifests for training
+VALIDATE = True  # Leave out new samples with a missing or malformed label (see validate_dataset.py)
 
 # === Class names ===
 class_names = ['Hello', 'Yes', 'No', 'Thanks', 'ILoveYou', 'Please']
@@ -15,42 +23,227 @@ class_names = ['Hello', 'Yes', 'No', 'Thanks', 'ILoveYou', 'Please']
 # === Split ratio ===
 split_ratios = {'train': 0.7, 'val': 0.2, 'test': 0.1}
 
-# === Create folders ===
-def create_dirs():
-    for split in ['train', 'val', 'test']:
-        os.makedirs(os.path.join(OUTPUT_BASE, split, 'images'), exist_ok=True)
-        os.makedirs(os.path.join(OUTPUT_BASE, split, 'labels'), exist_ok=True)
+# === Split assignment ===
+# Every sample is placed by a stable hash of its ID, so re-running gives the
+# same split and new samples never move existing ones. With STRATIFY each
+# class is balanced separately: new samples are visited in hash order and go to
+# the split furthest below its share for that class. Assignments are kept in
+# STATE_FILE and only samples missing from it are read and placed, so adding
+# data costs O(new samples). Delete dataset/ to re-split from scratch (e.g.
+# after changing split_ratios).
+SPLIT_SALT = 'isl-split-v1'
+STRATIFY = True
+
+def stable_fraction(key):
+    digest = hashlib.blake2b(f"{SPLIT_SALT}:{key}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') / 2 ** 64
+
+def hash_split(fraction):
+    cumulative = 0.0
+    for split, ratio in split_ratios.items():
+        cumulative += ratio
+        if fraction < cumulative:
+            return split
+    return split
+
+def label_class(label_text):
+    # Class of the first box; -1 for an empty (background) label, None if malformed
+    for line in label_text.splitlines():
+        parts = line.split()
+        if parts:
+            try:
+                return int(parts[0])
+            except ValueError:
+                return None
+    return -1
+
+def load_state():
+    state = {}
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line from an interrupted run
+                state[entry['key']] = entry
+    return state
+
+def assign_splits(state, new_keys, read_label):
+    # Returns [(key, split, cls)] for the new samples; `state` is updated in place
+    counts = {}
+    for entry in state.values():
+        per_class = counts.setdefault(entry['cls'], dict.fromkeys(split_ratios, 0))
+        per_class[entry['split']] += 1
+
+    assigned, malformed = [], []
+    for key in sorted(new_keys, key=stable_fraction):
+        cls = label_class(read_label(key)) if STRATIFY else -1
+        if cls is None:
+            malformed.append(key)
+            continue
+        fraction = stable_fraction(key)
+        if STRATIFY:
+            per_class = counts.setdefault(cls, dict.fromkeys(split_ratios, 0))
+            total = sum(per_class.values()) + 1
+            deficits = {split: ratio * total - per_class[split] for split, ratio in split_ratios.items()}
+            best = max(deficits.values())
+            # Ties (e.g. the first sample of a class) fall back to the hash bucket
+            preferred = hash_split(fraction)
+            split = preferred if deficits[preferred] == best else max(deficits, key=deficits.get)
+            per_class[split] += 1
+        else:
+            split = hash_split(fraction)
+        state[key] = {'key': key, 'split': split, 'cls': cls}
+        assigned.append((key, split, cls))
+    if malformed:
+        print(f"⚠️ Skipping {len(malformed)} samples with a malformed label, e.g. {malformed[0]}; "
+              f"run validate_dataset.py for details")
+    return assigned
+
+def write_manifests(state, removed, assigned, entry_line, manifest_ext):
+    # Appends new entries; manifests are only rewritten when samples disappeared
+    os.makedirs(OUTPUT_BASE, exist_ok=True)
+    if removed:
+        for key in removed:
+            del state[key]
+        with open(STATE_FILE, 'w') as f:
+            for entry in state.values():
+                f.write(json.dumps(entry) + '\n')
+        rewrite = [(entry['key'], entry['split']) for entry in state.values()]
+        for split in split_ratios:
+            with open(os.path.join(OUTPUT_BASE, split + manifest_ext), 'w') as f:
+                f.writelines(entry_line(key) + '\n' for key, entry_split in rewrite if entry_split == split)
+    else:
+        with open(STATE_FILE, 'a') as f:
+            for key, split, cls in assigned:
+                f.write(json.dumps({'key': key, 'split': split, 'cls': cls}) + '\n')
+        for split in split_ratios:
+            with open(os.path.join(OUTPUT_BASE, split + manifest_ext), 'a') as f:
+                f.writelines(entry_line(key) + '\n' for key, entry_split, _ in assigned if entry_split == split)
+
+def print_summary(state, assigned, removed):
+    totals = dict.fromkeys(split_ratios, 0)
+    for entry in state.values():
+        totals[entry['split']] += 1
+    print(f"✅ Dataset split complete: {len(assigned)} new, {len(removed)} removed, "
+          + ", ".join(f"{split} {count}" for split, count in totals.items()))
 
 # === Split data ===
+# Ultralytics reads the dataset from dataset/<split>.txt (one image path per
+# line) and finds each label by swapping images/ for labels/ in the path, so
+# no file is copied.
 def split_data():
-    images = [f for f in os.listdir(IMG_DIR) if f.endswith('.jpg')]
-    random.shuffle(images)
+    state = load_state()
+    present = {os.path.splitext(f)[0]: f for f in os.listdir(IMG_DIR) if f.endswith('.jpg')}
+    new_keys = [key for key in present if key not in state]
+    removed = [key for key in state if key not in present]
+    if VALIDATE and new_keys:
+        # Only unassigned samples are checked; validate_dataset.py's cache keeps a
+        # rejected sample from being re-read until its files change
+        invalid = invalid_keys(BASE, class_names, keys=new_keys)
+        if invalid:
+            print(f"⚠️ Skipping {len(invalid)} invalid samples; run validate_dataset.py for details")
+        new_keys = [key for key in new_keys if key not in invalid]
 
-    total = len(images)
-    train_end = int(split_ratios['train'] * total)
-    val_end = train_end + int(split_ratios['val'] * total)
+    def read_label(key):
+        label_path = os.path.join(LABEL_DIR, key + '.txt')
+        if not os.path.exists(label_path):
+            return ''
+        with open(label_path) as f:
+            return f.read()
 
-    split_map = {
-        'train': images[:train_end],
-        'val': images[train_end:val_end],
-        'test': images[val_end:]
-    }
+    assigned = assign_splits(state, new_keys, read_label)
+    write_manifests(state, removed, assigned,
+                    lambda key: os.path.abspath(os.path.join(IMG_DIR, present[key])), '.txt')
+    print_summary(state, assigned, removed)
+
+# === Split packed shards ===
+# Key manifests (dataset/<split>.keys) reference samples inside the shards.
+# With EXPORT_SHARDS only the newly assigned samples are exported into
+# dataset/<split>/ and appended to the image manifests used by data.yaml.
+def remove_exported(removed_splits):
+    # Deletes the exported image/label of samples that left the split
+    for split in split_ratios:
+        keys = {key for key, entry_split in removed_splits.items() if entry_split == split}
+        img_dir = os.path.join(OUTPUT_BASE, split, 'images')
+        label_dir = os.path.join(OUTPUT_BASE, split, 'labels')
+        if not keys or not os.path.isdir(img_dir):
+            continue
+        for name in os.listdir(img_dir):
+            if os.path.splitext(name)[0] in keys:
+                os.remove(os.path.join(img_dir, name))
+        for key in keys:
+            label_path = os.path.join(label_dir, key + '.txt')
+            if os.path.exists(label_path):
+                os.remove(label_path)
+
+def shard_signature(record):
+    # Where a sample's label lives; re-adding a key to the shards changes it
+    return [record['shard']] + record['label']
+
+def validate_shard_keys(reader, keys):
+    # Invalid keys among `keys`, with the same label checks as validate_dataset.py.
+    # Rejections are remembered in INVALID_FILE so later runs do not re-read them.
+    known = {}
+    if os.path.exists(INVALID_FILE):
+        with open(INVALID_FILE) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                known[entry['key']] = entry['signature']
+    invalid, found = set(), []
+    for key in keys:
+        signature = shard_signature(reader.records[key])
+        if known.get(key) == signature:
+            invalid.add(key)
+        elif check_label(reader.read_label(key), len(class_names))[0]:
+            invalid.add(key)
+            found.append({'key': key, 'signature': signature})
+    if found:
+        os.makedirs(OUTPUT_BASE, exist_ok=True)
+        with open(INVALID_FILE, 'a') as f:
+            f.writelines(json.dumps(entry) + '\n' for entry in found)
+    return invalid
 
-    for split, files in split_map.items():
-        for img_file in files:
-            label_file = img_file.replace('.jpg', '.txt')
+def split_shards():
+    reader = ShardReader(SHARD_DIR)
+    state = load_state()
+    present = set(reader.records)
+    new_keys = [key for key in reader.records if key not in state]
+    removed = [key for key in state if key not in present]
+    if VALIDATE and new_keys:
+        invalid = validate_shard_keys(reader, new_keys)
+        if invalid:
+            print(f"⚠️ Skipping {len(invalid)} invalid samples; run validate_dataset.py for details")
+        new_keys = [key for key in new_keys if key not in invalid]
+    removed_splits = {key: state[key]['split'] for key in removed}
 
-            shutil.copy2(os.path.join(IMG_DIR, img_file), os.path.join(OUTPUT_BASE, split, 'images', img_file))
-            shutil.copy2(os.path.join(LABEL_DIR, label_file), os.path.join(OUTPUT_BASE, split, 'labels', label_file))
+    assigned = assign_splits(state, new_keys, reader.read_label)
+    write_manifests(state, removed, assigned, lambda key: key, '.keys')
 
-    print("✅ Dataset split complete.")
+    if EXPORT_SHARDS:
+        remove_exported(removed_splits)
+        for split in split_ratios:
+            split_dir = os.path.join(OUTPUT_BASE, split)
+            keys = [key for key, entry_split, _ in assigned if entry_split == split]
+            export_yolo(reader, split_dir, keys)
+            image_path = lambda key: os.path.abspath(os.path.join(split_dir, 'images', key + reader.records[key]['ext']))
+            if removed:
+                keys = [entry['key'] for entry in state.values() if entry['split'] == split]
+            with open(os.path.join(OUTPUT_BASE, split + '.txt'), 'w' if removed else 'a') as f:
+                f.writelines(image_path(key) + '\n' for key in keys)
+    reader.close()
+    print_summary(state, assigned, removed)
 
 # === Generate data.yaml ===
 def write_yaml():
     data_yaml = {
-        'train': os.path.abspath(os.path.join(OUTPUT_BASE, 'train', 'images')),
-        'val': os.path.abspath(os.path.join(OUTPUT_BASE, 'val', 'images')),
-        'test': os.path.abspath(os.path.join(OUTPUT_BASE, 'test', 'images')),
+        'train': os.path.abspath(os.path.join(OUTPUT_BASE, 'train.txt')),
+        'val': os.path.abspath(os.path.join(OUTPUT_BASE, 'val.txt')),
+        'test': os.path.abspath(os.path.join(OUTPUT_BASE, 'test.txt')),
         'nc': len(class_names),
         'names': class_names
     }
@@ -62,6 +255,8 @@ def write_yaml():
 
 # === Main ===
 if __name__ == "__main__":
-    create_dirs()
-    split_data()
+    if os.path.exists(os.path.join(SHARD_DIR, INDEX_NAME)):
+        split_shards()
+    else:
+        split_data()
     write_yaml()
@@ -9,10 +9,16 @@ from tkinter import messagebox
 import tkinter.ttk as ttk
 from PIL import Image, ImageTk
 
+from sample_writer import SampleWriter
+from shard_store import ShardWriter
+from near_duplicates import DuplicateFilter
+
 # === Folder Setup ===
 BASE_PATH = 'datasets/train'
 IMG_PATH = os.path.join(BASE_PATH, 'images')
 LABEL_PATH = os.path.join(BASE_PATH, 'labels')
+SHARD_PATH = os.path.join(BASE_PATH, 'shards')
+USE_SHARDS = False  # Append samples to packed shards instead of loose image/label files
 
 os.makedirs(IMG_PATH, exist_ok=True)
 os.makedirs(LABEL_PATH, exist_ok=True)
@@ -30,6 +36,13 @@ paused = True
 current_label_idx = 0
 img_num = 0
 number_of_images = 20
+capture_rate = 2.0  # Samples saved per second while capturing
+last_saved = 0.0
+dedup = DuplicateFilter(max_distance=6)  # Skips frames whose hand crop repeats an earlier sample
+
+# === Encoding and disk writes happen on background threads ===
+writer = SampleWriter(IMG_PATH, LABEL_PATH, workers=4, max_pending=64,
+                      store=ShardWriter(SHARD_PATH) if USE_SHARDS else None)
 
 # === Camera Capture ===
 cap = cv2.VideoCapture(0)
@@ -58,6 +71,9 @@ def next_label():
         quit_app()
 
 def quit_app():
+    writer.close()
+    print(writer.summary())
+    print(dedup.summary())
     cap.release()
     cv2.destroyAllWindows()
     root.destroy()
@@ -128,12 +144,14 @@ quit_btn.grid(row=1, column=1, padx=10, pady=10)
 
 # === Capture Loop ===
 def capture_loop():
-    global img_num
+    global img_num, last_saved
     while True:
         ret, frame = cap.read()
         if not ret:
             break
 
+        # The dataset gets the frame as captured, without the preview overlay
+        clean_frame = frame.copy()
         h, w, _ = frame.shape
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         results = hands.process(rgb)
@@ -168,10 +186,9 @@ def capture_loop():
         video_label.imgtk = imgtk
         video_label.configure(image=imgtk)
 
-        if not paused and results.multi_hand_landmarks:
+        if (not paused and results.multi_hand_landmarks and time.time() - last_saved >= 1.0 / capture_rate
+                and dedup.check(labels[current_label_idx], clean_frame, (x_min, y_min, x_max, y_max))):
             img_id = str(uuid.uuid1())
-            img_filename = os.path.join(IMG_PATH, f"{labels[current_label_idx]}_{img_id}.jpg")
-            cv2.imwrite(img_filename, frame)
 
             # Save label in YOLO format
             x_center = ((x_min + x_max) / 2) / w
@@ -179,13 +196,12 @@ def capture_loop():
             bbox_width = (x_max - x_min) / w
             bbox_height = (y_max - y_min) / h
 
-            label_filename = os.path.join(LABEL_PATH, f"{labels[current_label_idx]}_{img_id}.txt")
-            with open(label_filename, 'w') as f:
-                f.write(f"{label_map[labels[current_label_idx]]} {x_center:.6f} {y_center:.6f} {bbox_width:.6f} {bbox_height:.6f}")
+            label_line = f"{label_map[labels[current_label_idx]]} {x_center:.6f} {y_center:.6f} {bbox_width:.6f} {bbox_height:.6f}"
+            writer.submit(f"{labels[current_label_idx]}_{img_id}", clean_frame, [label_line])
+            last_saved = time.time()
 
             img_num += 1
-            image_count_var.set(f"Images Captured: {img_num}/{number_of_images}")
-            time.sleep(1)
+            image_count_var.set(f"Images Captured: {img_num}/{number_of_images} ({dedup.rejected} repeats skipped)")
 
             if img_num >= number_of_images:
                 stop_capturing()
@@ -0,0 +1,335 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from multiprocessing import Pool
+
+try:
+    import cv2
+    import numpy as np
+
+    from near_duplicates import HashIndex, dhash
+except ImportError:
+    cv2 = None
+
+# === Dataset validation ===
+# Checks every image/label pair of a YOLO tree (<root>/images, <root>/labels)
+# on a process pool and reports class histograms, box sizes and near-duplicate
+# frames. Per-sample results are cached in <root>/.validation_cache.sqlite
+# keyed by the mtime and size of both files, so a re-run only rescans samples
+# that changed.
+#
+#     python validate_dataset.py datasets/train --report validation.json
+
+CACHE_NAME = '.validation_cache.sqlite'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+class_names = ['Hello', 'Yes', 'No', 'Thanks', 'ILoveYou', 'Please']
+
+SIZE_BINS = [0.0, 0.05, 0.1, 0.2, 0.3, 0.4, 0.6, 0.8, 1.0]  # sqrt(box area) as a fraction of the image
+NEAR_DUPLICATE_DISTANCE = 3  # Max differing dHash bits for two frames to count as near-duplicates
+EPS = 1e-6
+
+
+def check_label(text, num_classes):
+    # ([(code, detail)], [(cls, w, h)]) for one YOLO label file
+    errors, boxes = [], []
+    for number, line in enumerate(text.splitlines(), 1):
+        parts = line.split()
+        if not parts:
+            continue
+        if len(parts) != 5:
+            errors.append(('bad_format', f"line {number}: expected 5 values, got {len(parts)}"))
+            continue
+        try:
+            cls = int(parts[0])
+            x, y, w, h = map(float, parts[1:])
+        except ValueError:
+            errors.append(('bad_format', f"line {number}: non-numeric value"))
+            continue
+        if not 0 <= cls < num_classes:
+            errors.append(('class_out_of_range', f"line {number}: class {cls}"))
+        if (w <= 0 or h <= 0 or x - w / 2 < -EPS or y - h / 2 < -EPS
+                or x + w / 2 > 1 + EPS or y + h / 2 > 1 + EPS):
+            errors.append(('box_out_of_bounds', f"line {number}: {x:.3f} {y:.3f} {w:.3f} {h:.3f}"))
+        boxes.append((cls, w, h))
+    return errors, boxes
+
+
+def scan_sample(task):
+    # Runs in a worker: (key, record) for one image and its label
+    key, image_path, label_path, num_classes, want_hash = task
+    record = {'errors': [], 'boxes': []}
+    try:
+        with open(image_path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        record['errors'].append(('unreadable_image', str(e)))
+        return key, record
+    record['digest'] = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if image_path.lower().endswith(('.jpg', '.jpeg')) and not data.startswith(b'\xff\xd8'):
+        record['errors'].append(('unreadable_image', "not a JPEG file"))
+    elif want_hash and cv2 is not None:
+        gray = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+        if gray is None:
+            record['errors'].append(('unreadable_image', "could not decode"))
+        else:
+            record['dhash'] = dhash(gray)
+
+    if label_path is None:
+        record['errors'].append(('missing_label', "no matching .txt"))
+    else:
+        try:
+            with open(label_path, encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            record['errors'].append(('bad_format', str(e)))
+        else:
+            errors, boxes = check_label(text, num_classes)
+            record['errors'] += errors
+            record['boxes'] = boxes
+    return key, record
+
+
+def _signature(entry):
+    stat = entry.stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def list_pairs(root, keys=None):
+    # {key: (image_path, image_sig, label_path, label_sig)} and orphan label names;
+    # with `keys`, only those samples are stat'ed
+    img_dir, label_dir = os.path.join(root, 'images'), os.path.join(root, 'labels')
+    labels = {}
+    if os.path.isdir(label_dir):
+        with os.scandir(label_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.txt') and (keys is None or entry.name[:-4] in keys):
+                    labels[entry.name[:-4]] = (entry.path, _signature(entry))
+    pairs = {}
+    with os.scandir(img_dir) as entries:
+        for entry in entries:
+            key, ext = os.path.splitext(entry.name)
+            if ext.lower() in IMAGE_EXTENSIONS and (keys is None or key in keys):
+                label_path, label_sig = labels.pop(key, (None, None))
+                pairs[key] = (entry.path, _signature(entry), label_path, label_sig)
+    return pairs, sorted(labels)
+
+
+class ResultCache:
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS samples "
+                        "(key TEXT PRIMARY KEY, image_sig TEXT, label_sig TEXT, record TEXT)")
+
+    def load(self, keys=None):
+        if keys is None:
+            rows = self.db.execute("SELECT * FROM samples")
+        else:
+            keys, rows = list(keys), []
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows += self.db.execute(f"SELECT * FROM samples WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+        return {key: (image_sig, label_sig, record) for key, image_sig, label_sig, record in rows}
+
+    def store(self, rows):
+        self.db.executemany("INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?)", rows)
+        self.db.commit()
+
+    def remove(self, keys):
+        self.db.executemany("DELETE FROM samples WHERE key = ?", [(key,) for key in keys])
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+def count_near_duplicates(hashes, max_distance=NEAR_DUPLICATE_DISTANCE):
+    # (pairs, redundant images) among 64-bit hashes, through the same
+    # multi-index near_duplicates.py uses, so each hash is only compared with
+    # the hashes it shares a band with
+    counts = {}
+    for value in hashes:
+        counts[value] = counts.get(value, 0) + 1
+    unique = list(counts)
+    parent = list(range(len(unique)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    pairs = sum(n * (n - 1) // 2 for n in counts.values())
+    index = HashIndex(max_distance)
+    for i, value in enumerate(unique):
+        for _, j, _ in index.matches(value):
+            pairs += counts[value] * counts[unique[j]]
+            parent[find(i)] = find(j)
+        index.add(value, i)
+    groups = {}
+    for i, value in enumerate(unique):
+        groups[find(i)] = groups.get(find(i), 0) + counts[value]
+    return pairs, sum(size - 1 for size in groups.values())
+
+
+def _percentiles(values, points=(5, 50, 95)):
+    if not values:
+        return {}
+    values = sorted(values)
+    return {f"p{p}": round(values[min(len(values) - 1, len(values) * p // 100)], 4) for p in points}
+
+
+def build_report(records, orphan_labels, names):
+    errors, examples = {}, {}
+    class_boxes = dict.fromkeys(names, 0)
+    class_images = dict.fromkeys(names, 0)
+    size_histogram = [0] * (len(SIZE_BINS) - 1)
+    widths, heights, hashes, digests = [], [], [], {}
+    empty = 0
+    for key, record in records.items():
+        for code, detail in record['errors']:
+            errors[code] = errors.get(code, 0) + 1
+            examples.setdefault(code, [])
+            if len(examples[code]) < 10:
+                examples[code].append(f"{key}: {detail}")
+        if not record['boxes']:
+            empty += 1
+        for cls in {box[0] for box in record['boxes']}:
+            if 0 <= cls < len(names):
+                class_images[names[cls]] += 1
+        for cls, w, h in record['boxes']:
+            if 0 <= cls < len(names):
+                class_boxes[names[cls]] += 1
+            widths.append(w)
+            heights.append(h)
+            size = max(0.0, w * h) ** 0.5
+            for index in range(len(size_histogram)):
+                if size <= SIZE_BINS[index + 1] or index == len(size_histogram) - 1:
+                    size_histogram[index] += 1
+                    break
+        if 'dhash' in record:
+            hashes.append(record['dhash'])
+        if 'digest' in record:
+            digests[record['digest']] = digests.get(record['digest'], 0) + 1
+    if orphan_labels:
+        errors['orphan_label'] = len(orphan_labels)
+        examples['orphan_label'] = [f"{key}.txt" for key in orphan_labels[:10]]
+
+    near_pairs, near_redundant = count_near_duplicates(hashes) if hashes else (None, None)
+    return {
+        'samples': len(records),
+        'invalid_samples': sum(1 for record in records.values() if record['errors']),
+        'samples_without_boxes': empty,
+        'errors': errors,
+        'error_examples': examples,
+        'class_boxes': class_boxes,
+        'class_images': class_images,
+        'box_size_histogram': {f"{SIZE_BINS[i]:.2f}-{SIZE_BINS[i + 1]:.2f}": count
+                               for i, count in enumerate(size_histogram)},
+        'box_width': _percentiles(widths),
+        'box_height': _percentiles(heights),
+        'exact_duplicates': sum(count - 1 for count in digests.values()),
+        'near_duplicate_pairs': near_pairs,
+        'near_duplicate_images': near_redundant,
+    }
+
+
+def validate(root, names=class_names, workers=None, near_duplicates=True, use_cache=True, chunksize=64,
+             keys=None):
+    # Returns ({key: record}, report); `keys` limits the pass (and the report) to those samples
+    started = time.perf_counter()
+    keys = set(keys) if keys is not None else None
+    pairs, orphan_labels = list_pairs(root, keys)
+    want_hash = near_duplicates and cv2 is not None
+    cache = ResultCache(os.path.join(root, CACHE_NAME)) if use_cache else None
+    cached = cache.load(keys) if cache else {}
+
+    records, tasks = {}, []
+    for key, (image_path, image_sig, label_path, label_sig) in pairs.items():
+        hit = cached.get(key)
+        if hit and hit[0] == image_sig and hit[1] == label_sig:
+            record = json.loads(hit[2])
+            if not want_hash or 'dhash' in record or record['errors']:
+                records[key] = record
+                continue
+        tasks.append((key, image_path, label_path, len(names), want_hash))
+
+    rows = []
+    if tasks:
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            results = map(scan_sample, tasks)
+        else:
+            pool = Pool(workers)
+            results = pool.imap_unordered(scan_sample, tasks, chunksize=chunksize)
+        for key, record in results:
+            records[key] = record
+            if cache:
+                rows.append((key, pairs[key][1], pairs[key][3], json.dumps(record)))
+                if len(rows) >= 5000:
+                    cache.store(rows)
+                    rows = []
+        if workers != 1:
+            pool.close()
+            pool.join()
+    if cache:
+        cache.store(rows)
+        cache.remove([key for key in cached if key not in pairs])
+        cache.close()
+
+    report = build_report(records, orphan_labels, names)
+    report['rescanned'] = len(tasks)
+    report['seconds'] = round(time.perf_counter() - started, 2)
+    return records, report
+
+
+def invalid_keys(root, names=class_names, workers=None, keys=None):
+    # Sample keys (file stems) that must not be used for training, among `keys` if given
+    records, _ = validate(root, names, workers, near_duplicates=False, keys=keys)
+    return {key for key, record in records.items() if record['errors']}
+
+
+def print_report(report):
+    print(f"Scanned {report['samples']} samples ({report['rescanned']} rescanned) in {report['seconds']}s")
+    if report['errors']:
+        print(f"❌ {report['invalid_samples']} invalid samples:")
+        for code, count in report['errors'].items():
+            print(f"   {code}: {count}  e.g. {', '.join(report['error_examples'][code][:3])}")
+    else:
+        print("✅ All samples valid.")
+    print("Boxes per class: " + ", ".join(f"{name} {count}" for name, count in report['class_boxes'].items()))
+    print("Box size (sqrt area): " + ", ".join(f"{bin_} {count}" for bin_, count in report['box_size_histogram'].items()))
+    print(f"Box width {report['box_width']}, height {report['box_height']}")
+    print(f"Exact duplicates: {report['exact_duplicates']}")
+    if report['near_duplicate_pairs'] is not None:
+        print(f"Near-duplicates: {report['near_duplicate_pairs']} pairs, "
+              f"{report['near_duplicate_images']} redundant images")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a YOLO images/labels tree and report dataset statistics")
+    parser.add_argument('roots', nargs='+', help="Folders containing images/ and labels/")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--report', help="Write the full report as JSON")
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--no-near-duplicates', action='store_true', help="Skip image decoding for dHash")
+    args = parser.parse_args()
+
+    reports = {}
+    for root in args.roots:
+        _, report = validate(root, workers=args.workers, near_duplicates=not args.no_near_duplicates,
+                             use_cache=not args.no_cache)
+        print(f"=== {root} ===")
+        print_report(report)
+        reports[root] = report
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(reports, f, indent=2)
+    sys.exit(1 if any(report['errors'] for report in reports.values()) else 0)
+
+
+if __name__ == '__main__':
+    main()
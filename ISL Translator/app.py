@@ -1,330 +1,393 @@
-from flask import Flask, render_template, Response, jsonify, request
-import cv2
-import numpy as np
+from flask import Flask, render_template, Response, jsonify, request, session
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from ultralytics import YOLO
 import os
 from dotenv import load_dotenv
-import requests
+import sys
 import time
 import threading
-import queue
-import base64
+
+# Frame sources are shared with the tkinter detectors at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from detection_session import DetectionSession
+from pipeline_metrics import PipelineMetrics
+from model_registry import ModelRegistry
+from multi_source import BatchInferenceServer, SourceContext
+from sessions import SessionManager
+from shared_camera import SharedCamera
+from static_assets import AssetCache, asset_response
+from sentence_translator import GroqBackend, SentenceTranslator, GROQ_API_URL
 
 app = Flask(__name__)
 
 # Load environment variables
 load_dotenv()
+# Signs the session cookie that ties each browser to its own pipeline
+app.secret_key = os.getenv("FLASK_SECRET_KEY") or os.urandom(24)
+
+# Camera, detection and translation run on real threads, so Socket.IO uses the
+# threading async mode unless overridden
+socketio = SocketIO(app, async_mode=os.getenv("SOCKETIO_ASYNC_MODE", "threading"))
 API_KEY = os.getenv("GROQ_API_KEY")
+LAZY_LOAD_MODELS = os.getenv("LAZY_LOAD_MODELS", "false").lower() == "true"
+MAX_LOADED_MODELS = int(os.getenv("MAX_LOADED_MODELS", "2"))
+# Evict least recently used models once loaded weights exceed this many MB (unset: no limit)
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB")) if os.getenv("MODEL_MEMORY_BUDGET_MB") else None
+LLM_API_URL = os.getenv("LLM_API_URL", GROQ_API_URL)
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "8.0"))
+MAX_INFERENCE_FPS = float(os.getenv("MAX_INFERENCE_FPS", "10"))
+MOTION_COMPENSATION = os.getenv("MOTION_COMPENSATION", "false").lower() == "true"
+TARGET_STREAM_KBPS = float(os.getenv("TARGET_STREAM_KBPS", "4000"))
+SESSION_IDLE_TIMEOUT = float(os.getenv("SESSION_IDLE_TIMEOUT", "900"))
+# Camera index, 'auto', an rtsp/http URL, a video file or an image folder
+CAMERA_SOURCE = os.getenv("CAMERA_SOURCE", "auto")
+# Run YOLO only on crops around MediaPipe-located hands, at a smaller input size
+ROI_INFERENCE = os.getenv("ROI_INFERENCE", "false").lower() == "true"
+ROI_IMGSZ = int(os.getenv("ROI_IMGSZ", "320"))
+
+# Model weights per mode, loaded once and shared by every detection run
+MODEL_PATHS = {
+    'hospital': "weights/hospital_best.pt",
+    'general': "weights/general_best.pt",
+}
+model_registry = ModelRegistry(MODEL_PATHS, loader=YOLO, max_models=MAX_LOADED_MODELS,
+                               memory_budget_mb=MODEL_MEMORY_BUDGET_MB)
+
+# Rolling per-stage latency histograms and counters, exported on /metrics
+metrics = PipelineMetrics()
+
+def push_event(event, payload, room=None):
+    # Push an update to connected browsers (one session's room, or everyone);
+    # failures must never reach the detection loop
+    try:
+        payload['sent_at'] = time.time()
+        socketio.emit(event, payload, to=room)
+    except Exception as e:
+        print(f"Socket emit error: {e}")
+
+# Translations run on background workers so the stream never waits on the LLM
+translation_backend = GroqBackend(API_KEY, api_url=LLM_API_URL, timeout=(2.0, LLM_TIMEOUT))
 
-# Global variables
-model = None
-is_detection_running = False
-detected_words = []
-last_detection_time = 0
-last_llm_update_time = 0
-DETECTION_INTERVAL = 1.0  # Update detection every 1 second
 LLM_UPDATE_INTERVAL = 5.0  # Update LLM every 5 seconds
-frame_queue = queue.Queue(maxsize=2)
-camera_thread_obj = None
-cached_translation = ""
-show_boxes = True
-last_detected_word = None
-last_detected_time = 0
 WORD_COOLDOWN = 2.0  # Minimum time between same word detections
-WORD_HISTORY = []  # Store last few detected words
 MAX_HISTORY = 3  # Maximum number of words to keep in history
+VOTE_WINDOW = 3  # Consecutive detections a label's confidence is summed over
+MIN_VOTE_SCORE = 0.8  # Summed confidence needed before a word is accepted
+MAX_WORDS = 256  # Upper bound on words kept for a session
+BUILDER_SETTINGS = {'history_size': MAX_HISTORY, 'cooldown': WORD_COOLDOWN, 'vote_window': VOTE_WINDOW,
+                    'min_score': MIN_VOTE_SCORE, 'max_words': MAX_WORDS}
+SESSION_SETTINGS = {
+    'builder': BUILDER_SETTINGS,
+    'llm_update_interval': LLM_UPDATE_INTERVAL,
+    'max_inference_fps': MAX_INFERENCE_FPS,
+    'motion_compensation': MOTION_COMPENSATION,
+    'target_kbps': TARGET_STREAM_KBPS,
+    'roi_inference': ROI_INFERENCE,
+    'roi_imgsz': ROI_IMGSZ,
+}
+
+# The camera and loaded models are shared; everything else is per session
+shared_camera = SharedCamera(CAMERA_SOURCE, metrics=metrics)
+
+def create_session(session_id):
+    def session_emit(event, payload):
+        push_event(event, payload, room=session_id)
+    return DetectionSession(session_id, model_registry, translation_backend, session_emit,
+                            SESSION_SETTINGS, metrics=metrics)
+
+session_manager = SessionManager(create_session, idle_timeout=SESSION_IDLE_TIMEOUT)
 
-def load_model(is_hospital_mode):
-    model_path = "weights/hospital_best.pt" if is_hospital_mode else "weights/general_best.pt"
-    if not os.path.exists(model_path):
-        raise FileNotFoundError(f"Model file not found at: {model_path}")
-    return YOLO(model_path)
-
-def generate_sentence_groq(words):
-    joined = " ".join(words)
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "model": "llama3-70b-8192",
-        "messages": [
-            {"role": "system", "content": "You are a helpful assistant that converts grammatically incorrect or incomplete phrases into full meaningful English sentences."},
-            {"role": "user", "content": f"Convert this: '{joined}'"}
-        ],
-        "temperature": 0.7
-    }
-    response = requests.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=payload)
-    if response.status_code == 200:
-        return response.json()["choices"][0]["message"]["content"]
-    return "Translation error."
-
-def camera_thread():
-    global is_detection_running
-    camera = None
+def session_id():
+    if 'sid' not in session:
+        session['sid'] = SessionManager.new_id()
+    return session['sid']
+
+def current_session():
+    return session_manager.get(session_id())
+
+def any_session_running():
+    return any(stats['running'] for stats in session_manager.stats().values())
+
+def generate_frames(encoder, is_active, width=None):
+    # Each viewer only reads the latest published frame for its resolution, so
+    # adding viewers costs no extra inference or encoding
+    variant = encoder.subscribe(width)
+    last_seq = 0
     try:
-        # Try to open camera with different indices
-        for i in range(3):  # Try first 3 camera indices
-            try:
-                print(f"Attempting to open camera at index {i}")
-                camera = cv2.VideoCapture(i, cv2.CAP_DSHOW)  # Use DirectShow backend on Windows
-                
-                # Add a small delay after opening
-                time.sleep(1)
-                
-                if camera.isOpened():
-                    # Verify camera is working by reading a test frame
-                    ret, test_frame = camera.read()
-                    if ret and test_frame is not None:
-                        print(f"Successfully opened and verified camera at index {i}")
-                        # Set camera properties
-                        camera.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-                        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-                        camera.set(cv2.CAP_PROP_FPS, 30)
-                        
-                        # Verify camera properties
-                        width = camera.get(cv2.CAP_PROP_FRAME_WIDTH)
-                        height = camera.get(cv2.CAP_PROP_FRAME_HEIGHT)
-                        fps = camera.get(cv2.CAP_PROP_FPS)
-                        print(f"Camera properties - Width: {width}, Height: {height}, FPS: {fps}")
-                        break
-                    else:
-                        print(f"Camera at index {i} opened but failed to read frame")
-                        camera.release()
-                        camera = None
-                else:
-                    print(f"Failed to open camera at index {i}")
-                    if camera is not None:
-                        camera.release()
-                        camera = None
-            except Exception as e:
-                print(f"Error opening camera at index {i}: {e}")
-                if camera is not None:
-                    camera.release()
-                    camera = None
-                continue
-        
-        if camera is None or not camera.isOpened():
-            print("Error: Could not open any camera")
-            is_detection_running = False
-            return
-            
-        print("Camera initialized successfully")
-        
-        while is_detection_running:
+        while is_active():
             try:
-                success, frame = camera.read()
-                if not success or frame is None:
-                    print("Failed to grab frame")
-                    # Try to recover camera
-                    print("Attempting to recover camera connection...")
-                    camera.release()
-                    time.sleep(1)
-                    camera = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-                    if not camera.isOpened():
-                        print("Failed to recover camera connection")
-                        is_detection_running = False
-                        break
-                    continue
-                
-                try:
-                    if frame_queue.full():
-                        frame_queue.get_nowait()  # Remove old frame
-                    frame_queue.put(frame.copy())
-                except queue.Full:
+                last_seq, frame = variant.broadcaster.wait_for_frame(last_seq, timeout=1.0)
+                if frame is None:
                     continue
-                except Exception as e:
-                    print(f"Error in frame queue: {e}")
-                    continue
-                
-                # Add a small sleep to prevent CPU overload
-                time.sleep(0.01)
-                
-            except Exception as e:
-                print(f"Error in camera loop: {e}")
-                break
-    
-    except Exception as e:
-        print(f"Camera thread error: {e}")
-    finally:
-        if camera is not None:
-            camera.release()
-        print("Camera released")
-        is_detection_running = False
-
-def generate_frames():
-    global model, is_detection_running, detected_words, last_detection_time, last_llm_update_time, cached_translation, last_detected_word, last_detected_time, WORD_HISTORY
-    
-    while is_detection_running:
-        try:
-            frame = frame_queue.get(timeout=1.0)
-            current_time = time.time()
-            
-            # Run detection at specified interval
-            if current_time - last_detection_time >= DETECTION_INTERVAL:
-                try:
-                    results = model(frame)
-                    
-                    if results[0].boxes.cls.numel() > 0:
-                        current_labels = [model.names[int(cls)] for cls in results[0].boxes.cls]
-                        for label in current_labels:
-                            # Check if it's a new word or enough time has passed since the last detection
-                            if (label != last_detected_word or 
-                                current_time - last_detected_time >= WORD_COOLDOWN):
-                                # Check if the word is not in recent history
-                                if label not in WORD_HISTORY:
-                                    if label not in detected_words:
-                                        detected_words.append(label)
-                                    last_detected_word = label
-                                    last_detected_time = current_time
-                                    
-                                    # Update word history
-                                    WORD_HISTORY.append(label)
-                                    if len(WORD_HISTORY) > MAX_HISTORY:
-                                        WORD_HISTORY.pop(0)
-                    
-                    last_detection_time = current_time
-                    
-                    # Update LLM output at specified interval
-                    if current_time - last_llm_update_time >= LLM_UPDATE_INTERVAL and detected_words:
-                        cached_translation = generate_sentence_groq(detected_words)
-                        last_llm_update_time = current_time
-                    
-                    # Draw bounding boxes if enabled
-                    if show_boxes:
-                        annotated_frame = results[0].plot()
-                    else:
-                        annotated_frame = frame
-                except Exception as e:
-                    print(f"Detection error: {e}")
-                    annotated_frame = frame
-            else:
-                annotated_frame = frame
-
-            # Convert frame to JPEG
-            ret, buffer = cv2.imencode('.jpg', annotated_frame)
-            if ret:
-                frame = buffer.tobytes()
+                metrics.inc('frames_streamed')
                 yield (b'--frame\r\n'
                        b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-            
-        except queue.Empty:
-            continue
-        except Exception as e:
-            print(f"Frame generation error: {e}")
-            continue
+            except Exception as e:
+                print(f"Frame generation error: {e}")
+                continue
+    finally:
+        encoder.unsubscribe(variant)
+
+# === Multi-source mode ===
+# Several cameras/video files captured concurrently, with their frames batched
+# into one model.predict call per tick and per-source words, translation and stream.
+# Socket.IO updates for a source only go to clients that subscribed to it.
+def source_room(source_id):
+    return f"source:{source_id}"
+
+def make_source_translator(source_id):
+    def on_result(translation):
+        push_event('translation', {'source_id': source_id, 'translation': translation}, room=source_room(source_id))
+    return SentenceTranslator(translation_backend, on_result=on_result, metrics=metrics)
+
+def handle_source_detections(context, detections, current_time):
+    added_words = context.builder.update([(det.label, det.conf) for det in detections], current_time)
+    if added_words:
+        push_event('words', {'source_id': context.source_id, 'added': added_words, 'detected_at': current_time},
+                   room=source_room(context.source_id))
+
+    detected_words = context.builder.snapshot()
+    if (current_time - context.last_llm_update_time >= LLM_UPDATE_INTERVAL and detected_words
+            and detected_words != context.last_submitted_words):
+        context.translator.submit(detected_words)
+        context.last_submitted_words = detected_words
+        context.last_llm_update_time = current_time
+
+batch_server = None
+source_model = None
+
+# Encoded page/asset variants, refreshed when the files change on disk
+EXTRA_DIR = os.path.join(app.root_path, 'Extra')
+asset_cache = AssetCache()
+asset_cache.preload([os.path.join(EXTRA_DIR, 'bg.jpg')])
 
 @app.route('/')
 def index():
-    # Load background image
-    bg_path = "Extra/bg.jpg"
-    bg_image = None
-    if os.path.exists(bg_path):
-        with open(bg_path, "rb") as img_file:
-            bg_image = base64.b64encode(img_file.read()).decode()
-    
-    return render_template('index.html', bg_image=bg_image)
+    # Assign the session id here so the Socket.IO handshake carries it too
+    session_id()
+
+    # The page has no per-request content, so it is rendered once per template change
+    template_path = os.path.join(app.root_path, app.template_folder, 'index.html')
+    page = asset_cache.memoize('index.html', os.path.getmtime(template_path),
+                              lambda: render_template('index.html'))
+    return asset_response(page, max_age=0)
+
+@app.route('/extra/<path:filename>')
+def extra_asset(filename):
+    # Background and other images are served pre-encoded from memory instead of being
+    # inlined into the page, so browsers can cache them
+    path = os.path.normpath(os.path.join(EXTRA_DIR, filename))
+    if not path.startswith(EXTRA_DIR + os.sep):
+        return Response(status=404)
+    asset = asset_cache.get(path)
+    if asset is None:
+        return Response(status=404)
+    return asset_response(asset)
 
 @app.route('/video_feed')
 def video_feed():
-    return Response(generate_frames(),
+    # Optional ?width= lets small clients receive a downscaled stream
+    width = request.args.get('width', type=int)
+    detection_session = current_session()
+    return Response(generate_frames(detection_session.encoder, lambda: detection_session.is_running, width),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
 @app.route('/start_detection', methods=['POST'])
 def start_detection():
-    global model, is_detection_running, detected_words, camera_thread_obj, frame_queue, show_boxes, last_detected_word, last_detected_time, WORD_HISTORY
-    
     try:
+        detection_session = current_session()
         # Check if detection is already running
-        if is_detection_running:
+        if detection_session.is_running:
             return jsonify({'status': 'error', 'message': 'Detection is already running'}), 400
-            
-        # Clear any existing frames
-        while not frame_queue.empty():
-            frame_queue.get_nowait()
+        if batch_server is not None and batch_server.running:
+            return jsonify({'status': 'error', 'message': 'Multi-source detection is running'}), 400
             
         data = request.json
         is_hospital_mode = data.get('hospital_mode', False)
         show_boxes = data.get('show_boxes', True)
         
-        # Load model
+        # Load model (shared through the registry) and attach to the shared camera
         try:
-            model = load_model(is_hospital_mode)
+            detection_session.set_mode(is_hospital_mode)
         except Exception as e:
             return jsonify({'status': 'error', 'message': f'Failed to load model: {str(e)}'}), 500
         
-        # Initialize detection state
-        is_detection_running = True
-        detected_words = []
-        last_detected_word = None
-        last_detected_time = 0
-        WORD_HISTORY = []
-        
-        # Start camera thread
-        camera_thread_obj = threading.Thread(target=camera_thread)
-        camera_thread_obj.daemon = True
-        camera_thread_obj.start()
-        
-        # Wait for camera initialization with timeout
-        timeout = 5  # 5 seconds timeout
-        start_time = time.time()
-        while camera_thread_obj.is_alive() and time.time() - start_time < timeout:
-            if not frame_queue.empty():
-                # Camera is working if we have frames
-                return jsonify({'status': 'success', 'message': 'Camera initialized successfully'})
-            time.sleep(0.1)
-            
-        # Check if camera thread is still alive and producing frames
-        if not camera_thread_obj.is_alive() or frame_queue.empty():
-            is_detection_running = False
+        if not detection_session.start(shared_camera, is_hospital_mode, show_boxes):
             return jsonify({'status': 'error', 'message': 'Camera initialization failed - no frames received'}), 500
             
         return jsonify({'status': 'success', 'message': 'Camera initialized successfully'})
     except Exception as e:
         print(f"Start detection error: {e}")
-        is_detection_running = False
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @app.route('/stop_detection', methods=['POST'])
 def stop_detection():
-    global is_detection_running, camera_thread_obj, frame_queue, last_detected_word, last_detected_time, WORD_HISTORY
-    
     try:
-        is_detection_running = False
-        
-        while not frame_queue.empty():
-            frame_queue.get_nowait()
-            
-        if camera_thread_obj and camera_thread_obj.is_alive():
-            camera_thread_obj.join(timeout=2.0)
-            
-        last_detected_word = None
-        last_detected_time = 0
-        WORD_HISTORY = []
-        
+        current_session().stop()
         return jsonify({'status': 'success'})
     except Exception as e:
         print(f"Stop detection error: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-@app.route('/get_detected_words', methods=['GET'])
-def get_detected_words():
-    global detected_words, cached_translation
+@app.route('/set_mode', methods=['POST'])
+def switch_mode():
+    try:
+        data = request.json or {}
+        detection_session = current_session()
+        detection_session.set_mode(data.get('hospital_mode', False))
+        return jsonify({'status': 'success', 'mode': detection_session.mode})
+    except Exception as e:
+        print(f"Mode switch error: {e}")
+        return jsonify({'status': 'error', 'message': f'Failed to load model: {str(e)}'}), 500
+
+@app.route('/start_sources', methods=['POST'])
+def start_sources():
+    # Body: {"sources": ["0", "1", "clips/a.mp4"] or {"id": "spec"}, "hospital_mode": false}
+    global batch_server, source_model
+    try:
+        if any_session_running() or (batch_server is not None and batch_server.running):
+            return jsonify({'status': 'error', 'message': 'Detection is already running'}), 400
+
+        data = request.json or {}
+        sources = data.get('sources') or []
+        if isinstance(sources, list):
+            sources = {f"source{i}": spec for i, spec in enumerate(sources)}
+        if not sources:
+            return jsonify({'status': 'error', 'message': 'No sources given'}), 400
+
+        try:
+            source_model = model_registry.get('hospital' if data.get('hospital_mode', False) else 'general')
+        except Exception as e:
+            return jsonify({'status': 'error', 'message': f'Failed to load model: {str(e)}'}), 500
+
+        builder_kwargs = BUILDER_SETTINGS
+        batch_server = BatchInferenceServer(lambda: source_model, on_detections=handle_source_detections,
+                                            max_fps=MAX_INFERENCE_FPS, metrics=metrics)
+        for source_id, spec in sources.items():
+            batch_server.add_source(SourceContext(source_id, str(spec), translator_factory=make_source_translator,
+                                                  builder_kwargs=builder_kwargs, metrics=metrics))
+        batch_server.start()
+        return jsonify({'status': 'success', 'sources': list(sources)})
+    except Exception as e:
+        print(f"Start sources error: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/stop_sources', methods=['POST'])
+def stop_sources():
+    global batch_server
+    if batch_server is not None:
+        batch_server.stop()
+        batch_server = None
+    return jsonify({'status': 'success'})
+
+@app.route('/sources', methods=['GET'])
+def list_sources():
+    if batch_server is None:
+        return jsonify({'running': False, 'sources': {}})
+    return jsonify(batch_server.stats())
+
+@app.route('/video_feed/<source_id>')
+def source_video_feed(source_id):
+    context = batch_server.get_source(source_id) if batch_server is not None else None
+    if context is None:
+        return jsonify({'status': 'error', 'message': f'Unknown source: {source_id}'}), 404
+    width = request.args.get('width', type=int)
+    return Response(generate_frames(context.encoder, lambda: context.running, width),
+                    mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@app.route('/get_detected_words/<source_id>', methods=['GET'])
+def get_source_detected_words(source_id):
+    context = batch_server.get_source(source_id) if batch_server is not None else None
+    if context is None:
+        return jsonify({'status': 'error', 'message': f'Unknown source: {source_id}'}), 404
+    detected_words = context.builder.snapshot()
     return jsonify({
-        'words': detected_words,
+        'words': list(detected_words),
         'full_sentence': ' '.join(detected_words),
-        'translation': cached_translation
+        'translation': context.translator.latest(),
+        'detected_at': context.builder.last_update_time
     })
 
+@app.route('/model_stats', methods=['GET'])
+def model_stats():
+    stats = model_registry.stats()
+    detection_session = current_session()
+    stats['current_mode'] = detection_session.mode
+    stats['streams'] = detection_session.encoder.stats()
+    return jsonify(stats)
+
+@app.route('/sessions', methods=['GET'])
+def list_sessions():
+    return jsonify({'count': len(session_manager), 'sessions': session_manager.stats()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    sessions = session_manager.stats()
+    metrics.set_gauge('sessions', len(sessions))
+    metrics.set_gauge('sessions_running', sum(1 for stats in sessions.values() if stats['running']))
+    metrics.set_gauge('camera_subscribers', shared_camera.subscriber_count)
+    source = shared_camera.source
+    if source is not None:
+        source_stats = source.stats()
+        metrics.set_gauge('camera_reconnects', source_stats['reconnects'])
+        if source_stats['last_frame_age'] is not None:
+            metrics.set_gauge('camera_last_frame_age_seconds', source_stats['last_frame_age'])
+    else:
+        # The camera was released; drop its stats instead of exporting stale values
+        metrics.clear_gauge('camera_reconnects')
+        metrics.clear_gauge('camera_last_frame_age_seconds')
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/get_detected_words', methods=['GET'])
+def get_detected_words():
+    # Polling endpoint kept for clients without a Socket.IO connection
+    return jsonify(current_session().words_payload())
+
 @app.route('/clear_words', methods=['POST'])
 def clear_words():
-    global detected_words, cached_translation, last_detected_word, last_detected_time, WORD_HISTORY
-    detected_words = []
-    cached_translation = ""
-    last_detected_word = None
-    last_detected_time = 0
-    WORD_HISTORY = []
+    current_session().clear()
     return jsonify({'status': 'success'})
 
+@socketio.on('connect')
+def handle_connect():
+    # Each browser joins its own session room; new clients get one full snapshot, then only diffs
+    detection_session = current_session()
+    join_room(detection_session.session_id)
+    payload = detection_session.words_payload()
+    emit('snapshot', {
+        'words': payload['words'],
+        'translation': payload['translation'],
+        'sent_at': time.time()
+    })
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    # Idle time for the reaper counts from when the last push client left
+    session_manager.touch(session.get('sid'))
+
+@socketio.on('subscribe_source')
+def handle_subscribe_source(data):
+    # Sent by pages showing /video_feed/<source_id>; joins that source's room
+    source_id = str((data or {}).get('source_id', ''))
+    context = batch_server.get_source(source_id) if batch_server is not None else None
+    if context is None:
+        emit('source_error', {'source_id': source_id, 'message': f'Unknown source: {source_id}'})
+        return
+    join_room(source_room(source_id))
+    detected_words = context.builder.snapshot()
+    emit('snapshot', {
+        'source_id': source_id,
+        'words': list(detected_words),
+        'translation': context.translator.latest(),
+        'sent_at': time.time()
+    })
+
+@socketio.on('unsubscribe_source')
+def handle_unsubscribe_source(data):
+    leave_room(source_room(str((data or {}).get('source_id', ''))))
+
 if __name__ == '__main__':
-    app.run(debug=True) 
\ No newline at end of file
+    if not LAZY_LOAD_MODELS:
+        # Load and warm up every mode in the background so the first start is fast
+        threading.Thread(target=model_registry.preload, daemon=True).start()
+    socketio.run(app, debug=True) 
\ No newline at end of file
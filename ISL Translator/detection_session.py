@@ -0,0 +1,184 @@
+import queue
+import threading
+import time
+
+from common.hand_roi import RoiInference
+from inference_scheduler import Detection, InferenceScheduler, results_to_detections
+from sentence_builder import SentenceBuilder
+from sentence_translator import SentenceTranslator
+from stream_encoder import StreamEncoder
+
+
+class DetectionSession:
+    # All per-client pipeline state: selected model, box toggle, word history,
+    # translation, inference scheduler and encoded stream. Loaded models and the
+    # camera are shared; everything a user can change lives here.
+
+    def __init__(self, session_id, model_registry, translation_backend, emit, settings, metrics=None):
+        self.session_id = session_id
+        self.model_registry = model_registry
+        self.emit = emit
+        self.settings = settings
+        self.metrics = metrics
+        self.mode = None
+        self._active = (None, None)  # (model, inference lock), always swapped together
+        self.show_boxes = True
+        self.is_running = False
+        self.created_at = time.time()
+        self.last_seen = self.created_at
+        self.last_llm_update_time = 0
+        self.last_submitted_words = None
+        self.builder = SentenceBuilder(**settings['builder'])
+        self.translator = SentenceTranslator(translation_backend, on_result=self._on_translation, metrics=metrics)
+        self.scheduler = InferenceScheduler(self._run_inference, on_result=self._handle_detections,
+                                            max_fps=settings['max_inference_fps'],
+                                            motion_compensation=settings['motion_compensation'], metrics=metrics)
+        self.encoder = StreamEncoder(target_kbps=settings['target_kbps'], metrics=metrics)
+        # Optional two-stage inference on hand crops; full frame when MediaPipe is missing
+        self.roi = RoiInference(imgsz=settings['roi_imgsz']) if settings.get('roi_inference') else None
+        if self.roi is not None and not self.roi.available:
+            print("ROI inference requested but mediapipe is not installed; using full frames")
+            self.roi = None
+        self._camera = None
+        self._frame_queue = None
+        self._stream_thread = None
+
+    def touch(self):
+        self.last_seen = time.time()
+
+    @property
+    def model(self):
+        return self._active[0]
+
+    def set_mode(self, is_hospital_mode):
+        # The model and its lock are swapped as one tuple, so a running scheduler
+        # picks up the new pair on its next frame without restarting the camera
+        # and never runs one model under the other model's lock
+        name = 'hospital' if is_hospital_mode else 'general'
+        self._active = (self.model_registry.get(name), self.model_registry.inference_lock(name))
+        self.mode = name
+
+    def start(self, camera, is_hospital_mode, show_boxes, timeout=5.0):
+        self.set_mode(is_hospital_mode)
+        self.show_boxes = show_boxes
+        self.builder.clear()
+        self.encoder.reset()
+
+        self.is_running = True
+        self._camera = camera
+        self._frame_queue = camera.subscribe()
+        self.scheduler.start()
+        self._stream_thread = threading.Thread(target=self._stream_loop, daemon=True)
+        self._stream_thread.start()
+
+        if not camera.wait_ready(timeout):
+            self.stop()
+            return False
+        return True
+
+    def stop(self):
+        self.is_running = False
+        if self._camera is not None:
+            self._camera.unsubscribe(self._frame_queue)
+            self._camera = None
+        if self._stream_thread and self._stream_thread.is_alive():
+            self._stream_thread.join(timeout=2.0)
+        self.scheduler.stop()
+        self.encoder.reset()
+        self.builder.reset_history()
+
+    def clear(self):
+        self.builder.clear()
+        self.last_submitted_words = None
+        self.translator.clear()
+        self.emit('cleared', {})
+
+    def close(self):
+        self.stop()
+        self.translator.stop()
+
+    def words_payload(self):
+        detected_words = self.builder.snapshot()
+        return {
+            'words': list(detected_words),
+            'full_sentence': ' '.join(detected_words),
+            'translation': self.translator.latest(),
+            'detected_at': self.builder.last_update_time
+        }
+
+    def stats(self):
+        return {
+            'mode': self.mode,
+            'running': self.is_running,
+            'idle_seconds': round(time.time() - self.last_seen, 1),
+            'words': len(self.builder.snapshot()),
+            'inference_interval': round(self.scheduler.interval, 4),
+            'streams': self.encoder.stats(),
+        }
+
+    def _on_translation(self, translation):
+        self.emit('translation', {'translation': translation})
+
+    def _run_inference(self, frame):
+        # Unpacked once, so the whole frame uses one model and its own lock
+        active_model, lock = self._active
+        if self.roi is not None:
+            with lock:
+                boxes = self.roi.predict(active_model, frame)
+            return [Detection(x1, y1, x2, y2, active_model.names[cls], conf) for x1, y1, x2, y2, cls, conf in boxes]
+        with lock:
+            results = active_model(frame, verbose=False)
+        return results_to_detections(results[0], active_model.names)
+
+    def _handle_detections(self, detections, current_time):
+        # Runs on the inference thread after every completed detection
+        added_words = self.builder.update([(det.label, det.conf) for det in detections], current_time)
+
+        # Push only the newly accepted words the moment they appear
+        if added_words:
+            self.emit('words', {'added': added_words, 'detected_at': current_time})
+
+        # Queue an LLM update at specified interval, only when the words changed
+        detected_words = self.builder.snapshot()
+        if (current_time - self.last_llm_update_time >= self.settings['llm_update_interval'] and detected_words
+                and detected_words != self.last_submitted_words):
+            self.translator.submit(detected_words)
+            self.last_submitted_words = detected_words
+            self.last_llm_update_time = current_time
+
+    def _stream_loop(self):
+        # Single producer for every viewer of this session: hands the newest frame to
+        # the inference scheduler, re-draws the latest detections and encodes once per
+        # frame and resolution, so stream FPS is bounded by capture/encode rather than inference.
+        metrics = self.metrics
+        while self.is_running:
+            try:
+                frame, queued_at = self._frame_queue.get(timeout=1.0)
+                if metrics:
+                    metrics.since('queue_wait', queued_at)
+                self.scheduler.submit(frame)
+
+                # Draw bounding boxes if enabled
+                if self.show_boxes:
+                    stage_start = time.perf_counter()
+                    annotated_frame = self.scheduler.annotate(frame)
+                    if metrics:
+                        metrics.since('annotate', stage_start)
+                else:
+                    annotated_frame = frame
+
+                # Convert frame to JPEG once per active resolution and hand it to all viewers
+                overlay_version = self.scheduler.version if self.show_boxes else None
+                self.encoder.publish(annotated_frame, overlay_version=overlay_version)
+
+            except queue.Empty:
+                # The shared camera gave up (no device or unrecoverable read failure)
+                camera = self._camera
+                if camera is not None and not camera.is_alive():
+                    self.is_running = False
+                continue
+            except Exception as e:
+                print(f"[{self.session_id}] Stream thread error: {e}")
+                continue
+
+        self.encoder.reset()
@@ -0,0 +1,87 @@
+import threading
+
+
+class FrameBroadcaster:
+    # Holds only the latest encoded frame. A single producer publishes into it and
+    # any number of /video_feed viewers read from it, so inference and JPEG
+    # encoding happen once per frame no matter how many tabs are open.
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+
+    def publish(self, frame_bytes):
+        with self._cond:
+            self._frame = frame_bytes
+            self._seq += 1
+            self._cond.notify_all()
+
+    def reset(self):
+        with self._cond:
+            self._frame = None
+            self._cond.notify_all()
+
+    def latest(self):
+        with self._cond:
+            return self._seq, self._frame
+
+    def wait_for_frame(self, last_seq, timeout=1.0):
+        # Block until a frame newer than last_seq exists. Slow viewers simply skip
+        # to the newest frame instead of queueing old ones.
+        with self._cond:
+            if self._seq == last_seq or self._frame is None:
+                self._cond.wait(timeout)
+            if self._seq == last_seq or self._frame is None:
+                return last_seq, None
+            return self._seq, self._frame
+
+
+if __name__ == '__main__':
+    # Fan-out benchmark: python frame_broadcaster.py [fps] [seconds] [frame_kb]
+    # One producer publishes synthetic JPEG-sized frames at `fps` while 1-16
+    # viewer threads wait on the broadcaster, reporting the frame rate each
+    # viewer receives and the publish-to-receive latency.
+    import sys
+    import time
+
+    fps = float(sys.argv[1]) if len(sys.argv) > 1 else 30.0
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    frame = bytes(int(sys.argv[3]) * 1024 if len(sys.argv) > 3 else 60 * 1024)
+
+    for viewers in (1, 2, 4, 8, 16):
+        broadcaster = FrameBroadcaster()
+        published_at = {}
+        stop = threading.Event()
+        received = [[] for _ in range(viewers)]
+
+        def view(latencies):
+            seq = 0
+            while not stop.is_set():
+                seq, data = broadcaster.wait_for_frame(seq, timeout=0.1)
+                if data is not None:
+                    latencies.append(time.perf_counter() - published_at[seq])
+
+        threads = [threading.Thread(target=view, args=(received[i],)) for i in range(viewers)]
+        for thread in threads:
+            thread.start()
+
+        started = time.perf_counter()
+        seq = 0
+        while time.perf_counter() - started < seconds:
+            seq += 1
+            published_at[seq] = time.perf_counter()
+            broadcaster.publish(frame)
+            time.sleep(max(0.0, started + seq / fps - time.perf_counter()))
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - started
+        latencies = sorted(latency for viewer in received for latency in viewer)
+        viewer_fps = [len(viewer) / elapsed for viewer in received]
+        if latencies:
+            print(f"{viewers:2d} viewers | published {seq / elapsed:5.1f} FPS | "
+                  f"per-viewer {min(viewer_fps):5.1f}-{max(viewer_fps):5.1f} FPS | "
+                  f"latency p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+                  f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
@@ -0,0 +1,164 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class Detection:
+    __slots__ = ('x1', 'y1', 'x2', 'y2', 'label', 'conf')
+
+    def __init__(self, x1, y1, x2, y2, label, conf):
+        self.x1, self.y1, self.x2, self.y2 = x1, y1, x2, y2
+        self.label = label
+        self.conf = conf
+
+
+def results_to_detections(result, names):
+    boxes = result.boxes
+    detections = []
+    for (x1, y1, x2, y2), cls, conf in zip(boxes.xyxy.tolist(), boxes.cls.tolist(), boxes.conf.tolist()):
+        detections.append(Detection(x1, y1, x2, y2, names[int(cls)], conf))
+    return detections
+
+
+def draw_detections(frame, detections, dx=0.0, dy=0.0):
+    if not detections:
+        return frame
+    annotated = frame.copy()
+    for det in detections:
+        x1, y1 = int(det.x1 + dx), int(det.y1 + dy)
+        x2, y2 = int(det.x2 + dx), int(det.y2 + dy)
+        cv2.rectangle(annotated, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        cv2.putText(annotated, f"{det.label} {det.conf:.2f}", (x1, max(0, y1 - 10)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+    return annotated
+
+
+class InferenceScheduler:
+    # Runs detection on its own thread against the newest submitted frame, as fast
+    # as the hardware allows up to max_fps. The stream thread never waits on it: it
+    # submits frames and re-draws the last result set onto every frame in between.
+    #
+    # The effective interval adapts to the measured inference time (EWMA) so that
+    # slow CPU-only hosts leave headroom for capture and encoding.
+
+    def __init__(self, infer, on_result=None, max_fps=10.0, headroom=1.25, motion_compensation=False, metrics=None):
+        self.infer = infer
+        self.on_result = on_result
+        self.max_fps = max_fps
+        self.headroom = headroom
+        self.motion_compensation = motion_compensation
+        self.metrics = metrics
+        self.avg_inference_time = 0.0
+        self.version = 0  # Bumped whenever a new result set replaces the old one
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_time = 0.0
+        self._detections = []
+        self._reference = None
+        self._running = False
+        self._thread = None
+
+    @property
+    def interval(self):
+        min_interval = 1.0 / self.max_fps if self.max_fps else 0.0
+        return max(min_interval, self.avg_inference_time * self.headroom)
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._frame = None
+            self._detections = []
+            self._reference = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    def submit(self, frame):
+        # Only the newest frame is kept; older unprocessed ones are simply replaced
+        with self._cond:
+            self._frame = frame
+            self._frame_time = time.time()
+            self._cond.notify()
+
+    def latest(self):
+        with self._cond:
+            return self._detections, self._reference
+
+    def annotate(self, frame):
+        detections, reference = self.latest()
+        if not detections:
+            return frame
+        dx, dy = 0.0, 0.0
+        if self.motion_compensation and reference is not None:
+            dx, dy = self._estimate_shift(reference, frame)
+        return draw_detections(frame, detections, dx, dy)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and self._frame is None:
+                    self._cond.wait(timeout=1.0)
+                if not self._running:
+                    return
+                frame, frame_time = self._frame, self._frame_time
+                self._frame = None
+
+            start = time.perf_counter()
+            try:
+                detections = self.infer(frame)
+            except Exception as e:
+                print(f"Detection error: {e}")
+                detections = []
+            elapsed = time.perf_counter() - start
+            if self.metrics:
+                self.metrics.observe('inference', elapsed)
+
+            if self.avg_inference_time:
+                self.avg_inference_time = 0.8 * self.avg_inference_time + 0.2 * elapsed
+            else:
+                self.avg_inference_time = elapsed
+
+            reference = self._downscale_gray(frame) if self.motion_compensation else None
+            with self._cond:
+                self._detections = detections
+                self._reference = reference
+                self.version += 1
+
+            if self.on_result:
+                try:
+                    self.on_result(detections, frame_time)
+                except Exception as e:
+                    print(f"Detection callback error: {e}")
+
+            # Respect the adaptive cap before picking up the next frame
+            remaining = self.interval - (time.perf_counter() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    @staticmethod
+    def _downscale_gray(frame, width=160):
+        scale = width / frame.shape[1]
+        small = cv2.resize(frame, (width, int(frame.shape[0] * scale)), interpolation=cv2.INTER_AREA)
+        return np.float32(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)), scale
+
+    def _estimate_shift(self, reference, frame):
+        # Global translation between the inference frame and the current frame via
+        # phase correlation on small grayscale copies
+        ref_gray, scale = reference
+        current_gray, _ = self._downscale_gray(frame, width=ref_gray.shape[1])
+        if current_gray.shape != ref_gray.shape:
+            return 0.0, 0.0
+        (dx, dy), response = cv2.phaseCorrelate(ref_gray, current_gray)
+        if response < 0.1:
+            return 0.0, 0.0
+        return dx / scale, dy / scale
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ModelRegistry:
+    # Process-wide cache of loaded YOLO models keyed by mode name. Models are
+    # loaded and warmed up once, then reused across start/stop cycles. When more
+    # weight files are registered than fit, the least recently used model is evicted.
+
+    def __init__(self, model_paths, loader, max_models=2, memory_budget_mb=None, warmup_size=(640, 640)):
+        self.model_paths = dict(model_paths)
+        self.loader = loader
+        self.max_models = max_models
+        self.memory_budget_mb = memory_budget_mb
+        self.warmup_size = warmup_size
+        self._models = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._inference_locks = {}
+        self._pending = {}
+
+    def register(self, name, path):
+        with self._lock:
+            self.model_paths[name] = path
+
+    def get(self, name):
+        # Loading and warm-up run outside the registry lock, so a cold load only
+        # blocks callers waiting for that same model; others keep getting hits
+        while True:
+            with self._lock:
+                if name in self._models:
+                    self._models.move_to_end(name)
+                    self._stats[name]['hits'] += 1
+                    return self._models[name]
+
+                path = self.model_paths.get(name)
+                if path is None:
+                    raise KeyError(f"Unknown model: {name}")
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"Model file not found at: {path}")
+
+                pending = self._pending.get(name)
+                loading = pending is None
+                if loading:
+                    pending = self._pending[name] = threading.Event()
+            if loading:
+                break
+            # Another caller is loading this model; re-check once it finishes
+            pending.wait()
+
+        try:
+            start = time.perf_counter()
+            model = self.loader(path)
+            load_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            self._warm_up(model)
+            warmup_time = time.perf_counter() - start
+
+            with self._lock:
+                self._models[name] = model
+                self._stats[name] = {
+                    'path': path,
+                    'size_mb': os.path.getsize(path) / (1024 * 1024),
+                    'load_seconds': round(load_time, 3),
+                    'warmup_seconds': round(warmup_time, 3),
+                    'loaded_at': time.time(),
+                    'hits': 0,
+                }
+                self._evict(keep=name)
+            print(f"Loaded model '{name}' in {load_time:.2f}s (warm-up {warmup_time:.2f}s)")
+            return model
+        finally:
+            with self._lock:
+                del self._pending[name]
+            pending.set()
+
+    def inference_lock(self, name):
+        # YOLO predictors are not thread-safe, so sessions sharing a model take turns
+        with self._lock:
+            return self._inference_locks.setdefault(name, threading.Lock())
+
+    def preload(self, names=None):
+        for name in names or list(self.model_paths):
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Failed to preload model '{name}': {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': list(self._models),
+                'registered': list(self.model_paths),
+                'loading': list(self._pending),
+                'models': {name: dict(stat) for name, stat in self._stats.items()},
+            }
+
+    def _warm_up(self, model):
+        # The first inference allocates buffers and fuses layers; pay that cost here
+        # instead of on the first live frame
+        height, width = self.warmup_size
+        try:
+            model(np.zeros((height, width, 3), dtype=np.uint8), verbose=False)
+        except Exception as e:
+            print(f"Model warm-up failed: {e}")
+
+    def _loaded_mb(self):
+        return sum(self._stats[name]['size_mb'] for name in self._models)
+
+    def _evict(self, keep):
+        while len(self._models) > 1:
+            over_count = self.max_models is not None and len(self._models) > self.max_models
+            over_budget = self.memory_budget_mb is not None and self._loaded_mb() > self.memory_budget_mb
+            if not (over_count or over_budget):
+                break
+            oldest = next(iter(self._models))
+            if oldest == keep:
+                break
+            del self._models[oldest]
+            del self._stats[oldest]
+            print(f"Evicted model '{oldest}'")
@@ -0,0 +1,248 @@
+import threading
+import time
+
+from common.frame_sources import open_source
+from inference_scheduler import draw_detections, results_to_detections
+from sentence_builder import SentenceBuilder
+from stream_encoder import StreamEncoder
+
+
+class SourceContext:
+    # Everything one camera/video source owns: its capture loop, the newest frame
+    # waiting for the batch, its latest detections, word history, translator and
+    # encoded stream.
+
+    def __init__(self, source_id, spec, translator_factory=None, builder_kwargs=None, metrics=None):
+        self.source_id = source_id
+        self.spec = spec
+        self.metrics = metrics
+        self.builder = SentenceBuilder(**(builder_kwargs or {}))
+        self.translator = translator_factory(source_id) if translator_factory else None
+        self.encoder = StreamEncoder(metrics=metrics)
+        self.detections = []
+        self.detection_version = 0
+        self.frames_captured = 0
+        self.frames_inferred = 0
+        self.last_submitted_words = None
+        self.last_llm_update_time = 0
+        self.running = False
+        self.source = None
+        self._pending = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.source is not None:
+            self.source.interrupt()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        self.encoder.reset()
+        if self.translator:
+            self.translator.stop()
+
+    def take_pending(self):
+        with self._lock:
+            frame, self._pending = self._pending, None
+            return frame
+
+    def set_detections(self, detections):
+        with self._lock:
+            self.detections = detections
+            self.detection_version += 1
+            self.frames_inferred += 1
+
+    def _capture_loop(self):
+        # Files are replayed at their native frame rate and looped; cameras and
+        # streams reconnect with backoff inside the source
+        self.source = open_source(self.spec)
+        if not self.source.open():
+            print(f"[{self.source_id}] Could not open source {self.spec}")
+            self.running = False
+            return
+        print(f"[{self.source_id}] Opened {self.spec}")
+
+        try:
+            while self.running:
+                success, frame = self.source.read()
+                if not success or frame is None:
+                    if self.running:
+                        print(f"[{self.source_id}] Source ended")
+                    self.running = False
+                    break
+
+                self.frames_captured += 1
+                with self._lock:
+                    self._pending = frame
+                    detections, version = self.detections, self.detection_version
+
+                annotated = draw_detections(frame, detections)
+                self.encoder.publish(annotated, overlay_version=version)
+        finally:
+            self.source.release()
+            print(f"[{self.source_id}] Released")
+
+    def stats(self):
+        return {
+            'spec': str(self.spec),
+            'running': self.running,
+            'frames_captured': self.frames_captured,
+            'frames_inferred': self.frames_inferred,
+            'source': self.source.stats() if self.source is not None else None,
+            'words': list(self.builder.snapshot()),
+            'streams': self.encoder.stats(),
+        }
+
+
+class BatchInferenceServer:
+    # One inference thread for all sources: every tick it collects the newest
+    # unprocessed frame from each source and runs them through a single
+    # model.predict call, then hands each source its own detections.
+
+    def __init__(self, get_model, on_detections=None, max_fps=10.0, metrics=None):
+        self.get_model = get_model
+        self.on_detections = on_detections
+        self.max_fps = max_fps
+        self.metrics = metrics
+        self.sources = {}
+        self.running = False
+        self.last_batch_size = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add_source(self, context):
+        with self._lock:
+            self.sources[context.source_id] = context
+        context.start()
+
+    def get_source(self, source_id):
+        with self._lock:
+            return self.sources.get(source_id)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        with self._lock:
+            sources, self.sources = list(self.sources.values()), {}
+        for context in sources:
+            context.stop()
+
+    def _run(self):
+        min_interval = 1.0 / self.max_fps if self.max_fps else 0.0
+        while self.running:
+            started = time.perf_counter()
+            with self._lock:
+                sources = list(self.sources.values())
+
+            batch = []
+            for context in sources:
+                frame = context.take_pending()
+                if frame is not None:
+                    batch.append((context, frame))
+
+            if not batch:
+                time.sleep(0.005)
+                continue
+
+            model = self.get_model()
+            try:
+                results = model.predict([frame for _, frame in batch], verbose=False)
+            except Exception as e:
+                print(f"Batch inference error: {e}")
+                time.sleep(0.1)
+                continue
+
+            elapsed = time.perf_counter() - started
+            self.last_batch_size = len(batch)
+            if self.metrics:
+                self.metrics.observe('batch_inference', elapsed)
+                self.metrics.inc('batch_frames', len(batch))
+
+            now = time.time()
+            for (context, _), result in zip(batch, results):
+                detections = results_to_detections(result, model.names)
+                context.set_detections(detections)
+                if self.on_detections:
+                    try:
+                        self.on_detections(context, detections, now)
+                    except Exception as e:
+                        print(f"[{context.source_id}] Detection callback error: {e}")
+
+            remaining = min_interval - (time.perf_counter() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def stats(self):
+        with self._lock:
+            sources = list(self.sources.values())
+        return {
+            'running': self.running,
+            'last_batch_size': self.last_batch_size,
+            'sources': {context.source_id: context.stats() for context in sources},
+        }
+
+
+if __name__ == '__main__':
+    # Scaling benchmark, from this folder: PYTHONPATH=.. python multi_source.py <weights> [seconds]
+    # Writes a synthetic 640x480 clip, replays it as 1, 2, 4 and 8 concurrent
+    # file sources through one BatchInferenceServer on CPU (uncapped tick rate),
+    # and reports aggregate and per-source inferred FPS, mean batch size and
+    # batch latency.
+    import os
+    import sys
+    import tempfile
+
+    import cv2
+    import numpy as np
+    from ultralytics import YOLO
+
+    from pipeline_metrics import PipelineMetrics
+
+    weights = sys.argv[1]
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    model = YOLO(weights)
+
+    clip = os.path.join(tempfile.mkdtemp(prefix='multi_source_bench_'), 'synthetic.mp4')
+    writer = cv2.VideoWriter(clip, cv2.VideoWriter_fourcc(*'mp4v'), 30, (640, 480))
+    for index in range(300):
+        frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+        x = 100 + (index * 4) % 400
+        cv2.rectangle(frame, (x, 150), (x + 140, 330), (180, 150, 130), -1)
+        writer.write(frame)
+    writer.release()
+    model.predict(np.zeros((480, 640, 3), dtype=np.uint8), verbose=False)  # Warm up outside the timed runs
+
+    for count in (1, 2, 4, 8):
+        metrics = PipelineMetrics()
+        server = BatchInferenceServer(lambda: model, max_fps=0, metrics=metrics)
+        for index in range(count):
+            server.add_source(SourceContext(f"src{index}", clip, metrics=metrics))
+        time.sleep(1.0)  # Let every source open before measuring
+        start_inferred = {context.source_id: context.frames_inferred for context in server.sources.values()}
+        server.start()
+        time.sleep(seconds)
+        inferred = {context.source_id: context.frames_inferred - start_inferred[context.source_id]
+                    for context in server.sources.values()}
+        summary = metrics.summary().get('batch_inference', {})
+        batches = summary.get('count', 0)
+        server.stop()
+
+        total = sum(inferred.values())
+        print(f"{count} sources | {total / seconds:6.1f} inferred FPS total, "
+              f"{min(inferred.values()) / seconds:5.1f}-{max(inferred.values()) / seconds:5.1f} per source | "
+              f"mean batch {total / batches if batches else 0:.2f} | "
+              f"batch latency p50 {summary.get('p50', float('nan')) * 1000:.0f} ms, "
+              f"p95 {summary.get('p95', float('nan')) * 1000:.0f} ms")
@@ -0,0 +1,169 @@
+import threading
+from collections import deque
+
+
+class SentenceBuilder:
+    # Turns a stream of per-frame detections into the list of accepted words.
+    #
+    # - Temporal voting: a label is only accepted once its summed confidence over the
+    #   last `vote_window` detection frames reaches `min_score`, so a single noisy
+    #   frame cannot add a word while one confident frame still can.
+    # - A fixed-size ring buffer of recently accepted labels, plus a per-label
+    #   cooldown, stops the same sign being added repeatedly.
+    # - Accepted words are capped at `max_words`; membership checks are O(1).
+    #
+    # Writers serialize on a lock. Readers use snapshot(), which returns an
+    # immutable tuple published after each change and never takes the lock.
+
+    def __init__(self, history_size=3, cooldown=2.0, vote_window=3, min_score=0.8, max_words=256):
+        self.history_size = history_size
+        self.cooldown = cooldown
+        self.vote_window = vote_window
+        self.min_score = min_score
+        self.max_words = max_words
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._reset_history()
+        self._words = deque()
+        self._word_set = set()
+        self._snapshot = ()
+        self.version = 0
+        self.last_update_time = 0
+
+    def _reset_history(self):
+        self._history = [None] * self.history_size
+        self._history_pos = 0
+        self._history_counts = {}
+        self._last_accepted = {}
+        self._votes = deque()
+        self._scores = {}
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def reset_history(self):
+        # Forget votes, cooldowns and recent history but keep the accepted words
+        with self._lock:
+            self._reset_history()
+
+    def snapshot(self):
+        return self._snapshot
+
+    def update(self, detections, now):
+        # detections: iterable of (label, confidence) from one inference pass.
+        # Returns the labels newly appended to the word list.
+        frame_scores = {}
+        for label, conf in detections:
+            if conf > frame_scores.get(label, 0.0):
+                frame_scores[label] = conf
+
+        added = []
+        with self._lock:
+            self._add_votes(frame_scores)
+            for label in list(frame_scores):
+                if self._scores.get(label, 0.0) < self.min_score:
+                    continue
+                if self._history_counts.get(label):
+                    continue
+                if now - self._last_accepted.get(label, float('-inf')) < self.cooldown:
+                    continue
+                self._accept(label, now)
+                if label not in self._word_set:
+                    self._append_word(label)
+                    added.append(label)
+
+            if added:
+                self._snapshot = tuple(self._words)
+                self.version += 1
+                self.last_update_time = now
+        return added
+
+    def _add_votes(self, frame_scores):
+        self._votes.append(frame_scores)
+        for label, conf in frame_scores.items():
+            self._scores[label] = self._scores.get(label, 0.0) + conf
+        if len(self._votes) > self.vote_window:
+            for label, conf in self._votes.popleft().items():
+                remaining = self._scores[label] - conf
+                if remaining <= 1e-9:
+                    del self._scores[label]
+                else:
+                    self._scores[label] = remaining
+
+    def _accept(self, label, now):
+        self._last_accepted[label] = now
+        # Clear this label's votes so the same gesture has to be re-confirmed
+        self._scores.pop(label, None)
+        for frame_scores in self._votes:
+            frame_scores.pop(label, None)
+
+        if self.history_size <= 0:
+            return
+        evicted = self._history[self._history_pos]
+        if evicted is not None:
+            count = self._history_counts[evicted] - 1
+            if count:
+                self._history_counts[evicted] = count
+            else:
+                del self._history_counts[evicted]
+        self._history[self._history_pos] = label
+        self._history_counts[label] = self._history_counts.get(label, 0) + 1
+        self._history_pos = (self._history_pos + 1) % self.history_size
+
+    def _append_word(self, label):
+        self._words.append(label)
+        self._word_set.add(label)
+        if len(self._words) > self.max_words:
+            self._word_set.discard(self._words.popleft())
+
+
+if __name__ == '__main__':
+    # Throughput benchmark: python sentence_builder.py [updates] [readers]
+    # Feeds random multi-label detection frames from a 50-sign vocabulary while
+    # reader threads poll snapshot() like the Socket.IO/HTTP handlers do, and
+    # reports update() throughput and per-call latency. The live pipeline needs
+    # 100+ updates/s.
+    import random
+    import sys
+    import time
+
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    reader_count = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    vocabulary = [f"sign{i}" for i in range(50)]
+    rng = random.Random(0)
+    frames = [[(rng.choice(vocabulary), rng.uniform(0.3, 1.0)) for _ in range(rng.randint(0, 3))]
+              for _ in range(updates)]
+
+    builder = SentenceBuilder(max_words=64)
+    stop = threading.Event()
+    reads = [0] * reader_count
+
+    def read(index):
+        while not stop.is_set():
+            builder.snapshot()
+            reads[index] += 1
+            time.sleep(0.001)
+
+    readers = [threading.Thread(target=read, args=(i,)) for i in range(reader_count)]
+    for reader in readers:
+        reader.start()
+
+    latencies = []
+    started = time.perf_counter()
+    for index, detections in enumerate(frames):
+        call_start = time.perf_counter()
+        builder.update(detections, index / 30.0)
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    latencies.sort()
+    print(f"{updates} updates in {elapsed:.2f}s: {updates / elapsed:,.0f} updates/s "
+          f"(p50 {latencies[len(latencies) // 2] * 1e6:.1f} us, p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.1f} us) "
+          f"with {reader_count} readers doing {sum(reads)} snapshots; {len(builder.snapshot())} words, "
+          f"version {builder.version}")
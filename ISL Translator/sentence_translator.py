@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+SYSTEM_PROMPT = "You are a helpful assistant that converts grammatically incorrect or incomplete phrases into full meaningful English sentences."
+
+
+def fallback_sentence(words):
+    return " ".join(words)
+
+
+class GroqBackend:
+    # Chat-completions client with a pooled keep-alive session. Point api_url at a
+    # local stub server to exercise the pipeline without the real API.
+
+    def __init__(self, api_key, api_url=GROQ_API_URL, model="llama3-70b-8192", timeout=(2.0, 8.0)):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.model = model
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+    def translate(self, words):
+        joined = " ".join(words)
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": f"Convert this: '{joined}'"}
+            ],
+            "temperature": 0.7
+        }
+        response = self.session.post(self.api_url, headers=headers, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+
+class SentenceTranslator:
+    # Background worker around a translation backend. submit() never blocks: only
+    # the newest word list is kept, older pending lists are dropped, and results are
+    # cached by the normalized word tuple so unchanged lists never hit the network.
+    # The worker thread is only started by the first list that needs the backend,
+    # so sessions that never detect anything cost no thread.
+
+    def __init__(self, backend, cache_size=128, on_result=None, metrics=None):
+        self.backend = backend
+        self.cache_size = cache_size
+        self.on_result = on_result
+        self.metrics = metrics
+        self._cache = OrderedDict()
+        self._cond = threading.Condition()
+        self._pending = None
+        self._generation = 0
+        self._latest = ""
+        self._running = True
+        self._worker = None
+
+    @staticmethod
+    def normalize(words):
+        return tuple(word.strip().lower() for word in words if word.strip())
+
+    def submit(self, words):
+        words = list(words)
+        key = self.normalize(words)
+        if not key:
+            return
+        with self._cond:
+            cached = self._cache.get(key)
+            self._generation += 1
+            if self.metrics:
+                self.metrics.inc('translation_cache_hits' if cached is not None else 'translation_requests')
+            if cached is None:
+                self._pending = (self._generation, key, words)
+                if self._worker is None and self._running:
+                    self._worker = threading.Thread(target=self._run, daemon=True)
+                    self._worker.start()
+                self._cond.notify()
+                return
+            self._cache.move_to_end(key)
+            self._pending = None
+            self._latest = cached
+        self._notify(cached)
+
+    def latest(self):
+        with self._cond:
+            return self._latest
+
+    def clear(self):
+        with self._cond:
+            self._generation += 1
+            self._pending = None
+            self._latest = ""
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def _notify(self, translation):
+        # Called without the lock held so callbacks may do I/O
+        if self.on_result:
+            try:
+                self.on_result(translation)
+            except Exception as e:
+                print(f"Translation callback error: {e}")
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                generation, key, words = self._pending
+                self._pending = None
+
+            start = time.perf_counter()
+            try:
+                translation = self.backend.translate(words)
+                cacheable = True
+            except Exception as e:
+                print(f"Translation error: {e}")
+                translation = fallback_sentence(words)
+                cacheable = False
+                if self.metrics:
+                    self.metrics.inc('translation_failures')
+            if self.metrics:
+                self.metrics.since('translation', start)
+
+            with self._cond:
+                if cacheable:
+                    self._cache[key] = translation
+                    self._cache.move_to_end(key)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+                # A newer word list was submitted while this one was in flight
+                current = generation == self._generation
+                if current:
+                    self._latest = translation
+            if current:
+                self._notify(translation)
@@ -0,0 +1,170 @@
+import os
+import threading
+import time
+import uuid
+
+
+class SessionManager:
+    # Maps a client session id to its own DetectionSession. Sessions are created on
+    # first use and closed by a reaper thread once idle for longer than idle_timeout.
+    # A session with running detection or an open stream counts as active, since a
+    # client that only listens on Socket.IO sends no requests while detection runs.
+
+    def __init__(self, factory, idle_timeout=900, reap_interval=30):
+        self.factory = factory
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+        self._reaper.start()
+
+    @staticmethod
+    def new_id():
+        return uuid.uuid4().hex
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self.factory(session_id)
+                self._sessions[session_id] = session
+        session.touch()
+        return session
+
+    def touch(self, session_id):
+        session = self.peek(session_id)
+        if session is not None:
+            session.touch()
+
+    def peek(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def close(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.close()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def stats(self):
+        with self._lock:
+            sessions = dict(self._sessions)
+        return {session_id: session.stats() for session_id, session in sessions.items()}
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(self.reap_interval)
+            self.reap()
+
+    def reap(self):
+        # Close idle sessions; returns how many were closed
+        now = time.time()
+        with self._lock:
+            expired = [session_id for session_id, session in self._sessions.items()
+                       if now - session.last_seen > self.idle_timeout
+                       and not session.is_running and not session.encoder.stats()]
+            sessions = [self._sessions.pop(session_id) for session_id in expired]
+        for session in sessions:
+            print(f"Evicting idle session {session.session_id}")
+            try:
+                session.close()
+            except Exception as e:
+                print(f"Session close error: {e}")
+        return len(sessions)
+
+if __name__ == '__main__':
+    # Load test, from this folder: python sessions.py [max_clients] [requests_per_client]
+    # Imports the Flask app but swaps in a session factory that builds real
+    # DetectionSessions over a fake model and translation backend, so no weights,
+    # camera or API key are needed. For 1..max_clients concurrent clients, each
+    # with its own cookie and so its own session, it drives /get_detected_words and
+    # /set_mode through Flask test clients and reports request latency p50/p99, then
+    # the memory (tracemalloc) and threads each new session adds.
+    import sys
+    import tempfile
+    import tracemalloc
+
+    import app as web
+    from detection_session import DetectionSession
+    from model_registry import ModelRegistry
+
+    class _FakeModel:
+        names = {0: 'Hello'}
+
+        def __call__(self, frame, verbose=False):
+            return []
+
+    class _FakeBackend:
+        def translate(self, words):
+            return ' '.join(words)
+
+    max_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    weights_dir = tempfile.mkdtemp(prefix='session_load_')
+    fake_paths = {}
+    for name in ('general', 'hospital'):
+        fake_paths[name] = os.path.join(weights_dir, name + '.pt')
+        open(fake_paths[name], 'wb').close()
+    registry = ModelRegistry(fake_paths, loader=lambda path: _FakeModel())
+    backend = _FakeBackend()
+
+    def create_session(session_id):
+        return DetectionSession(session_id, registry, backend, lambda event, payload: None,
+                                web.SESSION_SETTINGS, metrics=web.metrics)
+
+    clients = 1
+    while clients <= max_clients:
+        web.session_manager = SessionManager(create_session, idle_timeout=900)
+        latencies = {'/get_detected_words': [], '/set_mode': []}
+        barrier = threading.Barrier(clients)
+
+        def client(index):
+            test_client = web.app.test_client()
+            barrier.wait()
+            for request_index in range(per_client):
+                if request_index % 5 == 4:
+                    url = '/set_mode'
+                    started = time.perf_counter()
+                    test_client.post(url, json={'hospital_mode': bool(request_index % 2)})
+                else:
+                    url = '/get_detected_words'
+                    started = time.perf_counter()
+                    test_client.get(url)
+                latencies[url].append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+        wall_started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - wall_started
+
+        report = []
+        for url, samples in latencies.items():
+            samples.sort()
+            report.append(f"{url} p50 {samples[len(samples) // 2] * 1000:5.2f} ms, "
+                          f"p99 {samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000:6.2f} ms")
+        print(f"{clients:4d} clients | {clients * per_client / wall:6.0f} req/s | " + " | ".join(report)
+              + f" | sessions {len(web.session_manager)}")
+        clients *= 4
+
+    # Footprint of idle sessions, as created by cookie-less requests
+    manager = SessionManager(create_session, idle_timeout=900)
+    count = 200
+    threads_before = threading.active_count()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(count):
+        manager.get(SessionManager.new_id())
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    added = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    print(f"{count} idle sessions | {added / count / 1024:.1f} KiB per session (tracemalloc) | "
+          f"{(threading.active_count() - threads_before) / count:.2f} threads per session")
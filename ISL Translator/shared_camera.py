@@ -0,0 +1,135 @@
+import queue
+import threading
+import time
+
+from common.frame_sources import open_source
+
+
+class SharedCamera:
+    # One physical camera shared by every session. It opens on the first
+    # subscriber and releases on the last; each subscriber gets its own small
+    # newest-frames queue, so a slow session never holds back the others.
+
+    def __init__(self, source_spec='auto', metrics=None, queue_size=2):
+        self.source_spec = source_spec
+        self.source = None
+        self.metrics = metrics
+        self.queue_size = queue_size
+        self.ready = threading.Event()
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+    def subscribe(self):
+        frame_queue = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.append(frame_queue)
+            if self._running:
+                return frame_queue
+            previous = self._thread
+
+        # Let a camera that is still shutting down release the device first
+        if previous is not None and previous.is_alive():
+            previous.join(timeout=3.0)
+
+        with self._lock:
+            if not self._running and frame_queue in self._subscribers:
+                self._running = True
+                self.ready.clear()
+                self._thread = threading.Thread(target=self._camera_loop, daemon=True)
+                self._thread.start()
+        return frame_queue
+
+    def unsubscribe(self, frame_queue):
+        with self._lock:
+            if frame_queue in self._subscribers:
+                self._subscribers.remove(frame_queue)
+            if not self._subscribers:
+                self._running = False
+                if self.source is not None:
+                    # Wake a reader that is waiting to reconnect
+                    self.source.interrupt()
+        while not frame_queue.empty():
+            frame_queue.get_nowait()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait_ready(self, timeout=5.0):
+        # True once the camera produced a frame, False if it failed or timed out
+        start_time = time.time()
+        while self.is_alive() and time.time() - start_time < timeout:
+            if self.ready.wait(0.1):
+                return True
+        return self.ready.is_set()
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def _camera_loop(self):
+        camera = None
+        try:
+            camera = open_source(self.source_spec, width=1280, height=720, fps=30)
+            if not camera.open():
+                print(f"Error: Could not open camera source {self.source_spec}")
+                return
+            self.source = camera
+
+            print("Camera initialized successfully")
+
+            while self._running:
+                try:
+                    read_start = time.perf_counter()
+                    success, frame = camera.read()
+                    if self.metrics:
+                        self.metrics.since('camera_read', read_start)
+                    if not success or frame is None:
+                        # The source already retried with backoff, so this is final
+                        if self.metrics:
+                            self.metrics.inc('camera_read_failures')
+                        if self._running:
+                            print("Failed to recover camera connection")
+                        break
+
+                    self.ready.set()
+                    if self.metrics:
+                        self.metrics.inc('frames_captured')
+
+                    # Sessions only read frames, so one copy is shared by all of them
+                    item = (frame.copy(), time.perf_counter())
+                    with self._lock:
+                        subscribers = list(self._subscribers)
+                    for frame_queue in subscribers:
+                        try:
+                            if frame_queue.full():
+                                frame_queue.get_nowait()  # Remove old frame
+                                if self.metrics:
+                                    self.metrics.inc('frames_dropped')
+                            frame_queue.put_nowait(item)
+                        except (queue.Full, queue.Empty):
+                            if self.metrics:
+                                self.metrics.inc('frames_dropped')
+
+                    # Add a small sleep to prevent CPU overload
+                    time.sleep(0.01)
+
+                except Exception as e:
+                    print(f"Error in camera loop: {e}")
+                    break
+
+        except Exception as e:
+            print(f"Camera thread error: {e}")
+        finally:
+            if camera is not None:
+                camera.release()
+            print("Camera released")
+            with self._lock:
+                # /metrics must not keep reporting a closed camera; a newer camera
+                # thread may already have installed its own source
+                if self.source is camera:
+                    self.source = None
+                if self._thread is threading.current_thread():
+                    self._running = False
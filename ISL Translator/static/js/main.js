@@ -12,7 +12,14 @@ document.addEventListener('DOMContentLoaded', function() {
 
     let isDetectionRunning = false;
     let detectedWordsList = [];
-    let videoFeedInterval = null;
+
+    // ?source=<id> shows one multi-source camera instead of this browser's own session
+    const viewedSource = new URLSearchParams(window.location.search).get('source');
+
+    // Session updates carry no source_id; source updates must match the viewed source
+    function isOwnPayload(data) {
+        return viewedSource ? data.source_id === viewedSource : data.source_id === undefined;
+    }
 
     // Function to show loading state
     function showLoading() {
@@ -30,9 +37,11 @@ document.addEventListener('DOMContentLoaded', function() {
     function updateVideoFeed() {
         if (isDetectionRunning) {
             const timestamp = new Date().getTime();
-            let videoUrl = '/video_feed';
+            let videoUrl = viewedSource ? `/video_feed/${encodeURIComponent(viewedSource)}` : '/video_feed';
             videoUrl += `?show_boxes=${showBoxes.checked}`;
             videoUrl += `&hospital_mode=${hospitalMode.checked}`;
+            // Ask for a stream no wider than the element actually shows
+            videoUrl += `&width=${Math.round(videoFeed.parentElement.clientWidth * (window.devicePixelRatio || 1))}`;
             videoUrl += `&t=${timestamp}`;
             
             // Add error handling for video feed
@@ -122,9 +131,8 @@ document.addEventListener('DOMContentLoaded', function() {
                     startBtn.innerHTML = '<i class="fas fa-play"></i> Start Detection';
                 }, 2000);
                 
-                // Start video feed updates
+                // Open the MJPEG stream once; it reconnects on error instead of on a timer
                 updateVideoFeed();
-                videoFeedInterval = setInterval(updateVideoFeed, 1000);
                 
                 // Add status indicator
                 const statusIndicator = document.createElement('div');
@@ -181,12 +189,6 @@ document.addEventListener('DOMContentLoaded', function() {
                 updateButtonStates();
                 videoFeed.src = '';
                 
-                // Clear the video feed update interval
-                if (videoFeedInterval) {
-                    clearInterval(videoFeedInterval);
-                    videoFeedInterval = null;
-                }
-                
                 // Remove status indicator
                 const statusIndicator = videoFeed.parentElement.querySelector('.status-indicator');
                 if (statusIndicator) {
@@ -220,10 +222,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 throw new Error('Failed to clear words');
             }
 
-            detectedWordsList = [];
-            detectedWords.innerHTML = '';
-            fullSentence.innerHTML = '';
-            translation.innerHTML = '';
+            resetWords();
             
             // Show success message
             clearBtn.innerHTML = '<i class="fas fa-check"></i> Cleared';
@@ -243,37 +242,96 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
-    hospitalMode.addEventListener('change', function() {
+    hospitalMode.addEventListener('change', async function() {
         if (isDetectionRunning) {
-            updateVideoFeed();
+            // Swap the model on the server without restarting the camera
+            try {
+                const response = await fetch('/set_mode', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        hospital_mode: hospitalMode.checked
+                    })
+                });
+
+                const data = await response.json();
+
+                if (!response.ok) {
+                    throw new Error(data.message || 'Failed to switch mode');
+                }
+            } catch (error) {
+                alert('Error switching mode: ' + error.message);
+            }
         }
     });
 
-    // Update detection output periodically
+    // Add one word badge to the output panel
+    function addWord(word) {
+        if (detectedWordsList.includes(word)) {
+            return;
+        }
+        detectedWordsList.push(word);
+        const wordElement = document.createElement('span');
+        wordElement.className = 'badge bg-primary me-1 mb-1';
+        wordElement.textContent = word;
+        detectedWords.appendChild(wordElement);
+        
+        // Add animation class
+        wordElement.classList.add('fade-in');
+        
+        // Remove animation class after animation completes
+        setTimeout(() => {
+            wordElement.classList.remove('fade-in');
+        }, 500);
+    }
+
+    function resetWords() {
+        detectedWordsList = [];
+        detectedWords.innerHTML = '';
+        fullSentence.innerHTML = '';
+        translation.innerHTML = '';
+    }
+
+    // Gesture-to-screen latency per transport, readable from the console as islLatency
+    const latencySamples = { push: [], poll: [] };
+    window.islLatency = function() {
+        const summary = {};
+        Object.keys(latencySamples).forEach(mode => {
+            const samples = latencySamples[mode].slice().sort((a, b) => a - b);
+            summary[mode] = samples.length ? {
+                count: samples.length,
+                p50_ms: samples[Math.floor(samples.length * 0.5)],
+                p95_ms: samples[Math.min(samples.length - 1, Math.floor(samples.length * 0.95))]
+            } : { count: 0 };
+        });
+        return summary;
+    };
+
+    function recordLatency(mode, detectedAt) {
+        if (!detectedAt) {
+            return;
+        }
+        const latencyMs = Date.now() - detectedAt * 1000;
+        latencySamples[mode].push(latencyMs);
+        if (latencySamples[mode].length > 500) {
+            latencySamples[mode].shift();
+        }
+        console.debug(`[${mode}] gesture-to-screen latency: ${latencyMs.toFixed(1)} ms`);
+    }
+
+    // Polling fallback, also used with ?transport=poll to compare latency
     function updateDetectionOutput() {
         if (isDetectionRunning) {
-            fetch('/get_detected_words')
+            fetch(viewedSource ? `/get_detected_words/${encodeURIComponent(viewedSource)}` : '/get_detected_words')
                 .then(response => response.json())
                 .then(data => {
-                    // Update detected words
-                    detectedWords.innerHTML = '';
-                    data.words.forEach(word => {
-                        if (!detectedWordsList.includes(word)) {
-                            detectedWordsList.push(word);
-                            const wordElement = document.createElement('span');
-                            wordElement.className = 'badge bg-primary me-1 mb-1';
-                            wordElement.textContent = word;
-                            detectedWords.appendChild(wordElement);
-                            
-                            // Add animation class
-                            wordElement.classList.add('fade-in');
-                            
-                            // Remove animation class after animation completes
-                            setTimeout(() => {
-                                wordElement.classList.remove('fade-in');
-                            }, 500);
-                        }
-                    });
+                    const before = detectedWordsList.length;
+                    data.words.forEach(addWord);
+                    if (detectedWordsList.length > before) {
+                        recordLatency('poll', data.detected_at);
+                    }
 
                     // Update full sentence and translation
                     fullSentence.textContent = data.full_sentence;
@@ -283,9 +341,58 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    if (viewedSource) {
+        // Multi-source cameras are started server-side (/start_sources); just open the stream
+        isDetectionRunning = true;
+        updateVideoFeed();
+    }
+
     // Initialize button states
     updateButtonStates();
     
-    // Update detection output every 1 second
-    setInterval(updateDetectionOutput, 1000);
-}); 
\ No newline at end of file
+    // Prefer server push; poll every 1 second only when Socket.IO is unavailable
+    const transport = new URLSearchParams(window.location.search).get('transport') || 'push';
+    if (transport === 'push' && typeof io !== 'undefined') {
+        const socket = io();
+
+        if (viewedSource) {
+            // (Re)subscribe on every connect, since rooms do not survive a reconnect
+            socket.on('connect', () => socket.emit('subscribe_source', { source_id: viewedSource }));
+            window.addEventListener('beforeunload', () => socket.emit('unsubscribe_source', { source_id: viewedSource }));
+        }
+
+        socket.on('snapshot', data => {
+            if (!isOwnPayload(data)) {
+                return;
+            }
+            resetWords();
+            data.words.forEach(addWord);
+            fullSentence.textContent = detectedWordsList.join(' ');
+            translation.textContent = data.translation;
+        });
+
+        socket.on('words', data => {
+            if (!isOwnPayload(data)) {
+                return;
+            }
+            data.added.forEach(addWord);
+            fullSentence.textContent = detectedWordsList.join(' ');
+            recordLatency('push', data.detected_at);
+        });
+
+        socket.on('translation', data => {
+            if (!isOwnPayload(data)) {
+                return;
+            }
+            translation.textContent = data.translation;
+        });
+
+        socket.on('cleared', data => {
+            if (isOwnPayload(data)) {
+                resetWords();
+            }
+        });
+    } else {
+        setInterval(updateDetectionOutput, 1000);
+    }
+});
\ No newline at end of file
@@ -0,0 +1,233 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from frame_broadcaster import FrameBroadcaster
+
+try:
+    from turbojpeg import TurboJPEG
+    _turbojpeg = TurboJPEG()
+except Exception:
+    _turbojpeg = None
+
+# Viewer widths are snapped to these so a handful of variants cover every client
+STREAM_WIDTHS = (320, 480, 640, 960, 1280)
+
+
+def encode_jpeg(frame, quality):
+    if _turbojpeg is not None:
+        return _turbojpeg.encode(frame, quality=quality)
+    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer.tobytes() if ret else None
+
+
+class StreamVariant:
+    # One output resolution: its own broadcaster and its own quality controller
+    # steering the JPEG quality towards the target bitrate.
+
+    def __init__(self, width, quality, target_bytes_per_second):
+        self.width = width
+        self.quality = quality
+        self.target_bytes_per_second = target_bytes_per_second
+        self.broadcaster = FrameBroadcaster()
+        self.subscribers = 0
+        self.bytes_per_second = 0.0
+        self.last_publish = None
+
+    def record(self, size, now, min_quality, max_quality):
+        if self.last_publish is not None:
+            rate = size / max(now - self.last_publish, 1e-3)
+            self.bytes_per_second = 0.9 * self.bytes_per_second + 0.1 * rate if self.bytes_per_second else rate
+            if self.target_bytes_per_second:
+                if self.bytes_per_second > self.target_bytes_per_second * 1.1:
+                    self.quality = max(min_quality, self.quality - 2)
+                elif self.bytes_per_second < self.target_bytes_per_second * 0.8:
+                    self.quality = min(max_quality, self.quality + 1)
+        self.last_publish = now
+
+
+class StreamEncoder:
+    # Encodes each annotated frame once per resolution that currently has viewers.
+    # Frames that did not visibly change since the last encode (and whose overlay is
+    # unchanged) are skipped, so a static scene costs almost no CPU or bandwidth.
+    # Change is measured against the last *encoded* frame, so slow movement adds up
+    # until it is published, and as a count of changed thumbnail pixels rather than
+    # a global mean, so a small moving hand in a still scene still counts.
+
+    def __init__(self, target_kbps=4000, quality=80, min_quality=40, max_quality=90,
+                 pixel_threshold=12, min_changed_pixels=4, max_skip_seconds=1.0, metrics=None):
+        self.target_bytes_per_second = target_kbps * 1000 / 8 if target_kbps else None
+        self.quality = quality
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.max_skip_seconds = max_skip_seconds
+        self.metrics = metrics
+        self._variants = {}
+        self._lock = threading.Lock()
+        self._last_thumbnail = None
+        self._last_overlay = None
+        self._last_encode = 0.0
+
+    @staticmethod
+    def snap_width(width):
+        if not width:
+            return None
+        candidates = [w for w in STREAM_WIDTHS if w <= width]
+        return candidates[-1] if candidates else STREAM_WIDTHS[0]
+
+    def subscribe(self, width=None):
+        width = self.snap_width(width)
+        with self._lock:
+            variant = self._variants.get(width)
+            if variant is None:
+                variant = StreamVariant(width, self.quality, self.target_bytes_per_second)
+                self._variants[width] = variant
+                # Force an encode so the new viewer gets a frame straight away
+                self._last_thumbnail = None
+            variant.subscribers += 1
+            return variant
+
+    def unsubscribe(self, variant):
+        with self._lock:
+            variant.subscribers -= 1
+            if variant.subscribers <= 0:
+                self._variants.pop(variant.width, None)
+
+    def reset(self):
+        with self._lock:
+            for variant in self._variants.values():
+                variant.broadcaster.reset()
+            self._last_thumbnail = None
+            self._last_overlay = None
+
+    def _unchanged(self, thumbnail, overlay_version, now):
+        previous = self._last_thumbnail
+        if previous is None or overlay_version != self._last_overlay:
+            return False
+        if now - self._last_encode >= self.max_skip_seconds:
+            return False
+        diff = cv2.absdiff(thumbnail, previous)
+        return cv2.countNonZero((diff > self.pixel_threshold).astype(np.uint8)) < self.min_changed_pixels
+
+    def publish(self, frame, overlay_version=None, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            variants = list(self._variants.values())
+        if not variants:
+            return
+
+        thumbnail = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (96, 54), interpolation=cv2.INTER_AREA)
+        if self._unchanged(thumbnail, overlay_version, now):
+            if self.metrics:
+                self.metrics.inc('frames_encode_skipped')
+            return
+        self._last_thumbnail = thumbnail
+        self._last_overlay = overlay_version
+        self._last_encode = now
+
+        height, width = frame.shape[:2]
+        for variant in variants:
+            start = time.perf_counter()
+            if variant.width and variant.width < width:
+                scaled_height = int(height * variant.width / width)
+                output = cv2.resize(frame, (variant.width, scaled_height), interpolation=cv2.INTER_AREA)
+            else:
+                output = frame
+            data = encode_jpeg(output, variant.quality)
+            if self.metrics:
+                self.metrics.since('encode', start)
+            if data is None:
+                continue
+            variant.record(len(data), now, self.min_quality, self.max_quality)
+            variant.broadcaster.publish(data)
+            if self.metrics:
+                self.metrics.inc('frames_published')
+                self.metrics.inc('bytes_encoded', len(data))
+
+    def stats(self):
+        with self._lock:
+            return {
+                str(variant.width or 'native'): {
+                    'subscribers': variant.subscribers,
+                    'quality': variant.quality,
+                    'kbps': round(variant.bytes_per_second * 8 / 1000, 1),
+                }
+                for variant in self._variants.values()
+            }
+
+
+if __name__ == '__main__':
+    # Bandwidth/CPU benchmark: python stream_encoder.py [video] [width]
+    # Streams a recorded clip (or a synthetic scene in thirds: still background,
+    # a hand-sized patch drifting 1 px per frame, then fast motion) through the
+    # encoder for one viewer and, for comparison, through the original path
+    # (full-resolution cv2.imencode at default quality on every frame) and through
+    # the encoder with gating off. Reports frames published, bytes/s and CPU time.
+    import sys
+
+    def synthetic_frames(count=300, size=(720, 1280)):
+        rng = np.random.default_rng(0)
+        background = rng.integers(0, 255, (size[0] // 8, size[1] // 8, 3), dtype=np.uint8)
+        background = cv2.resize(background, (size[1], size[0]), interpolation=cv2.INTER_LINEAR)
+        for index in range(count):
+            frame = background.copy()
+            if index >= count // 3:
+                # Slow signing for the middle third, fast movement for the last
+                step = 1 if index < 2 * count // 3 else 12
+                x = 400 + (index - count // 3) * step % 600
+                cv2.rectangle(frame, (x, 300), (x + 120, 460), (180, 150, 130), -1)
+            yield frame
+
+    def frames_from(path):
+        cap = cv2.VideoCapture(path)
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+        cap.release()
+
+    source = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] != '-' else None
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 640
+    fps = 30.0
+    frame_list = list(frames_from(source) if source else synthetic_frames())
+
+    def original(frame, now):
+        # The path before this encoder: full resolution, default quality, every frame
+        ret, buffer = cv2.imencode('.jpg', frame)
+        return buffer.tobytes()
+
+    def through_encoder(**options):
+        encoder = StreamEncoder(**options)
+        variant = encoder.subscribe(width)
+
+        def publish(frame, now):
+            seq_before = variant.broadcaster.latest()[0]
+            encoder.publish(frame, now=now)
+            seq, data = variant.broadcaster.latest()
+            return data if seq != seq_before else None
+        return publish
+
+    for label, publish in (("original", original),
+                           (f"{width} px, every frame", through_encoder(min_changed_pixels=0, max_skip_seconds=0.0)),
+                           (f"{width} px, gated", through_encoder())):
+        published = 0
+        total_bytes = 0
+        per_third = [0, 0, 0]
+        cpu_start = time.process_time()
+        for frames, frame in enumerate(frame_list, 1):
+            # Stream time, so max_skip_seconds behaves as in a live 30 FPS stream
+            data = publish(frame, frames / fps)
+            if data is not None:
+                published += 1
+                total_bytes += len(data)
+                per_third[min(2, (frames - 1) * 3 // len(frame_list))] += 1
+        cpu = time.process_time() - cpu_start
+        seconds = frames / fps
+        print(f"{label:20s} | {published}/{frames} frames published "
+              f"(by third: {per_third[0]}/{per_third[1]}/{per_third[2]}) | "
+              f"{total_bytes / seconds / 1000:8.1f} kB/s | CPU {cpu / frames * 1000:.2f} ms/frame")
@@ -0,0 +1,89 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sentence_builder import SentenceBuilder
+
+
+def test_single_confident_frame_is_accepted():
+    builder = SentenceBuilder(vote_window=3, min_score=0.8)
+    assert builder.update([('Hello', 0.9)], now=0.0) == ['Hello']
+    assert builder.snapshot() == ('Hello',)
+
+
+def test_weak_frames_need_a_majority_of_votes():
+    builder = SentenceBuilder(vote_window=3, min_score=0.8)
+    assert builder.update([('Hello', 0.5)], now=0.0) == []
+    assert builder.update([('Hello', 0.5)], now=0.1) == ['Hello']
+
+
+def test_votes_expire_outside_the_window():
+    builder = SentenceBuilder(vote_window=3, min_score=0.8)
+    assert builder.update([('Hello', 0.5)], now=0.0) == []
+    assert builder.update([], now=0.1) == []
+    assert builder.update([], now=0.2) == []
+    # The first vote has dropped out of the 3-frame window
+    assert builder.update([('Hello', 0.5)], now=0.3) == []
+    assert builder.snapshot() == ()
+
+
+def test_highest_confidence_per_frame_counts_once():
+    builder = SentenceBuilder(vote_window=3, min_score=0.8)
+    assert builder.update([('Hello', 0.5), ('Hello', 0.6)], now=0.0) == []
+    assert builder.update([('Hello', 0.3)], now=0.1) == ['Hello']
+
+
+def test_cooldown_blocks_re_adding_a_word():
+    builder = SentenceBuilder(history_size=0, cooldown=2.0, vote_window=1, min_score=0.5, max_words=1)
+    assert builder.update([('A', 0.9)], now=0.0) == ['A']
+    assert builder.update([('B', 0.9)], now=0.1) == ['B']  # evicts A from the word list
+    assert builder.update([('A', 0.9)], now=1.0) == []
+    assert builder.update([('A', 0.9)], now=2.5) == ['A']
+
+
+def test_history_ring_buffer_evicts_oldest_label():
+    builder = SentenceBuilder(history_size=2, cooldown=0.0, vote_window=1, min_score=0.5, max_words=1)
+    assert builder.update([('A', 0.9)], now=0.0) == ['A']
+    assert builder.update([('B', 0.9)], now=0.1) == ['B']
+    assert builder.update([('A', 0.9)], now=0.2) == []  # still in the last two accepted
+    assert builder.update([('C', 0.9)], now=0.3) == ['C']  # overwrites A's slot
+    assert builder.update([('A', 0.9)], now=0.4) == ['A']
+
+
+def test_max_words_keeps_the_most_recent():
+    builder = SentenceBuilder(history_size=0, cooldown=0.0, vote_window=1, min_score=0.5, max_words=3)
+    for index, label in enumerate('ABCDE'):
+        builder.update([(label, 0.9)], now=float(index))
+    assert builder.snapshot() == ('C', 'D', 'E')
+    # Evicted words can be added again; words still in the list cannot
+    assert builder.update([('A', 0.9)], now=10.0) == ['A']
+    assert builder.update([('E', 0.9)], now=11.0) == []
+    assert builder.snapshot() == ('D', 'E', 'A')
+
+
+def test_snapshot_is_immutable_and_versioned():
+    builder = SentenceBuilder(vote_window=1, min_score=0.5)
+    empty = builder.snapshot()
+    assert empty == () and builder.version == 0
+
+    builder.update([('Hello', 0.9)], now=1.0)
+    first = builder.snapshot()
+    assert isinstance(first, tuple)
+    assert builder.version == 1 and builder.last_update_time == 1.0
+
+    builder.update([('Hello', 0.9)], now=5.0)  # nothing added
+    assert builder.snapshot() is first
+    assert builder.version == 1
+
+
+def test_reset_history_keeps_words_and_clear_drops_them():
+    builder = SentenceBuilder(history_size=3, cooldown=10.0, vote_window=1, min_score=0.5)
+    builder.update([('Hello', 0.9)], now=0.0)
+    builder.reset_history()
+    assert builder.snapshot() == ('Hello',)
+
+    builder.clear()
+    assert builder.snapshot() == ()
+    assert builder.version == 0
+    assert builder.update([('Hello', 0.9)], now=0.1) == ['Hello']
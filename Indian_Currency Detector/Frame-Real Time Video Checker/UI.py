@@ -1,12 +1,21 @@
 import tkinter as tk
 from tkinter import messagebox
 import threading
+import time
 import cv2
 from ultralytics import YOLO
-from PIL import Image, ImageTk
 import os
+import sys
 import pyttsx3
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from common.adaptive_skip import AdaptiveFrameSkipper
+from common.frame_pipeline import LatestFrameCapture
+from common.frame_sources import open_source
+from common.hand_roi import RoiInference
+from common.speech_queue import SpeechQueue
+from common.tk_render import TkRenderScheduler
+
 # Path to the trained YOLOv8 model
 model_path = "weights/best.pt"
 if not os.path.exists(model_path):
@@ -19,32 +28,39 @@ model = YOLO(model_path)
 hand_sign_classes = ['Bad', 'Brother', 'Father', 'Food', 'Friend', 'Good', 'Hello', 'Help', 'House', 'I', 'Indian', 'Loud', 'Mummy', 'Namaste', 'Name', 'No', 'Place', 'Please', 'Quiet', 'Sleeping', 'Sorry', 'Strong', 'Thank-you', 'Time', 'Today', 'Water', 'What', 'Yes', 'Your', 'language', 'sign', 'you']
 
 cap = None
+capture = None
 is_running = False
-frame_skip = 2
-frame_count = 0
-last_detected = []
+# Inference is paced by measured inference time rather than a fixed skip
+skipper = AdaptiveFrameSkipper(target_fps=15.0)
+# Optional two-stage mode: MediaPipe finds hands, YOLO runs on the crops only
+roi = RoiInference(imgsz=320)
+roi_mode = False
 
-tts_engine = pyttsx3.init()
+# Speech runs on its own thread; on Windows the fixed vocabulary is pre-synthesized
+# once, in the background, when the audio assistant is first switched on
+speech = SpeechQueue(pyttsx3.init, cooldown=3.0, cache_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_cache"))
+speech.precache(hand_sign_classes)
 
 def start_detection():
-    global cap, is_running
+    global cap, capture, is_running
     if is_running:
         messagebox.showinfo("Info", "Detection is already running.")
         return
 
     source = camera_source.get()
-    if source == "Webcam":
-        cap = cv2.VideoCapture(0)
-    elif source == "Phone Camera":
-        ip_address = "http://192.168.174.37:4747/video"  # Change if needed
-        cap = cv2.VideoCapture(ip_address)
-
-    if not cap.isOpened():
+    # Streams reconnect with backoff on their own; files and folders loop
+    spec = "0" if source == "Webcam" else source_address.get()
+    cap = open_source(spec)
+    if not cap.open():
         messagebox.showerror("Error", f"Could not open {source}.")
         return
 
+    # Frames are read on their own thread so camera latency overlaps inference
+    capture = LatestFrameCapture(cap)
+    capture.start()
+    skipper.reset()
     is_running = True
-    threading.Thread(target=run_detection, daemon=True).start()
+    threading.Thread(target=run_detection, args=(capture,), daemon=True).start()
 
 def stop_detection():
     global cap, is_running
@@ -53,85 +69,119 @@ def stop_detection():
         return
 
     is_running = False
-    if cap:
+    if capture:
+        capture.stop()
+        print(f"Capture stats: {capture.stats()}")
+    elif cap:
         cap.release()
     cv2.destroyAllWindows()
     messagebox.showinfo("Info", "Detection stopped.")
 
-def run_detection():
-    global cap, is_running, frame_count, last_detected
-
-    while is_running:
-        ret, frame = cap.read()
-        if not ret:
-            print("❌ Error: Failed to capture frame")
-            stop_detection()
-            return
-
-        frame_count += 1
-        if frame_count % frame_skip != 0:
+def stop_if_current(source_capture):
+    # Runs on the Tk thread. A worker whose capture ended only stops detection if
+    # the user has not already stopped it, or started a new capture since
+    if is_running and capture is source_capture:
+        stop_detection()
+
+def run_detection(source_capture):
+
+    last_seq = 0
+    last_detections = []
+    # The capture is passed in, so after a quick Stop -> Start this worker never
+    # picks up the new capture; it exits and leaves it to the new worker
+    while is_running and capture is source_capture:
+        pooled = source_capture.get(last_seq)
+        if pooled is None:
+            if not source_capture.running:
+                renderer.post('stop', lambda: stop_if_current(source_capture))
+                return
+            continue
+        last_seq = pooled.seq
+
+        # Boxes are drawn straight into the pooled buffer; it is handed back once
+        # the display copy has been made
+        frame = pooled.array
+        if not skipper.ready():
+            # Skipped frames are still shown, with the most recent boxes
+            draw_detections(frame, last_detections)
+            renderer.submit(frame, pooled.captured_at)
+            pooled.release()
             continue
 
-        resized_frame = cv2.resize(frame, (480, 360))
         try:
-            results = model.predict(resized_frame, conf=0.5, verbose=False)[0]
+            started = time.perf_counter()
+            detections = predict_signs(frame)
+            skipper.record(started, time.perf_counter() - started)
+            renderer.post('inference', lambda summary=skipper.summary(): inference_text.set(summary))
         except Exception as e:
             print(f"❌ Error during model prediction: {e}")
-            stop_detection()
+            pooled.release()
+            renderer.post('stop', lambda: stop_if_current(source_capture))
             return
 
-        detected_labels = []
-
-        try:
-            for box in results.boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                conf = float(box.conf[0])
-                cls_id = int(box.cls[0])
-
-                class_name = hand_sign_classes[cls_id] if cls_id < len(hand_sign_classes) else "Unknown"
-                print(f"Detected: {class_name} with confidence {conf:.2f}")
-                detected_labels.append(class_name)
-
-                # Scale bounding boxes to original frame
-                scale_x = frame.shape[1] / resized_frame.shape[1]
-                scale_y = frame.shape[0] / resized_frame.shape[0]
-                x1, x2 = int(x1 * scale_x), int(x2 * scale_x)
-                y1, y2 = int(y1 * scale_y), int(y2 * scale_y)
-
-                # Draw box and label
-                color = (0, 255, 0)
-                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                label = f"{class_name} ({conf:.2f})"
-                cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-        except AttributeError as e:
-            print(f"❌ Error processing detection results: {e}")
-            detected_labels = []
-
-        update_labels(detected_labels)
-
-        # Update video in GUI
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(frame)
-        imgtk = ImageTk.PhotoImage(image=img)
-        video_label.imgtk = imgtk
-        video_label.configure(image=imgtk)
+        last_detections = detections
+        detected_labels = draw_detections(frame, detections)
+        for (_, _, _, _, _, conf), class_name in zip(detections, detected_labels):
+            print(f"Detected: {class_name} with confidence {conf:.2f}")
+
+        # Widgets are only touched from the Tk thread; the renderer picks these up
+        renderer.post('labels', lambda labels=detected_labels: update_labels(labels))
+        announce_labels(detected_labels)
+        renderer.submit(frame, pooled.captured_at)
+        pooled.release()
+
+def draw_detections(frame, detections):
+    # Draws boxes and labels in place; returns the class names
+    detected_labels = []
+    for x1, y1, x2, y2, cls_id, conf in detections:
+        x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+        class_name = hand_sign_classes[cls_id] if cls_id < len(hand_sign_classes) else "Unknown"
+        detected_labels.append(class_name)
+
+        # Draw box and label
+        color = (0, 255, 0)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        label = f"{class_name} ({conf:.2f})"
+        cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+    return detected_labels
+
+def predict_signs(frame):
+    # [(x1, y1, x2, y2, cls_id, conf)] in frame coordinates
+    if roi_mode and roi.available:
+        # Only padded crops around the hands MediaPipe finds go through YOLO
+        return roi.predict(model, frame, conf=0.5)
+
+    resized_frame = cv2.resize(frame, (480, 360))
+    results = model.predict(resized_frame, conf=0.5, verbose=False)[0]
+
+    # Scale bounding boxes to original frame
+    scale_x = frame.shape[1] / resized_frame.shape[1]
+    scale_y = frame.shape[0] / resized_frame.shape[0]
+    boxes = results.boxes
+    return [(x1 * scale_x, y1 * scale_y, x2 * scale_x, y2 * scale_y, int(cls), conf)
+            for (x1, y1, x2, y2), cls, conf in zip(boxes.xyxy.tolist(), boxes.cls.tolist(), boxes.conf.tolist())]
+
+def set_roi_mode():
+    global roi_mode
+    roi_mode = roi_enabled.get()
+    if roi_mode and not roi.available:
+        messagebox.showwarning("Hand ROI Mode", "MediaPipe is not installed; using full-frame inference.")
+
+def record_latency(captured_at):
+    if capture:
+        capture.record_display(captured_at)
 
 def update_labels(labels):
     if labels:
         detected_text.set("\n".join(labels))
         detected_label.config(fg="green")
-        announce_labels(labels)
     else:
         detected_text.set("No hand sign detected")
         detected_label.config(fg="red")
 
 def announce_labels(labels):
-    global last_detected
-    if audio_assistant_enabled.get() and labels != last_detected:
-        for label in labels:
-            tts_engine.say(label)
-        tts_engine.runAndWait()
-        last_detected = labels
+    # Only enqueues; repeats are collapsed and held back by the per-label cooldown
+    speech.announce(labels)
 
 # --- GUI Setup ---
 root = tk.Tk()
@@ -139,7 +189,10 @@ root.title("Indian Sign Language Detector")
 root.configure(bg="#f0f0f0")
 
 camera_source = tk.StringVar(value="Webcam")
+# Phone stream URL, RTSP address, video file or image folder for the non-webcam options
+source_address = tk.StringVar(value="http://192.168.174.37:4747/video")
 audio_assistant_enabled = tk.BooleanVar(value=False)
+roi_enabled = tk.BooleanVar(value=False)
 
 # Header
 header = tk.Frame(root, bg="#1e3d59", height=60)
@@ -162,9 +215,11 @@ control_panel.pack(side=tk.RIGHT, fill=tk.Y, padx=10, pady=10)
 camera_label = tk.Label(control_panel, text="Select Camera Source:", font=("Arial", 14), bg="#ffffff")
 camera_label.pack(pady=10)
 
-camera_dropdown = tk.OptionMenu(control_panel, camera_source, "Webcam", "Phone Camera")
+camera_dropdown = tk.OptionMenu(control_panel, camera_source, "Webcam", "Phone Camera", "Video File / Folder")
 camera_dropdown.config(width=20, font=("Arial", 12), bg="#e0e0e0", fg="black")
 camera_dropdown.pack(pady=10)
+source_entry = tk.Entry(control_panel, textvariable=source_address, width=28, font=("Arial", 10))
+source_entry.pack(pady=(0, 10), padx=10)
 
 detected_text = tk.StringVar()
 detected_text.set("No hand sign detected")
@@ -183,4 +238,21 @@ exit_button.pack(pady=10)
 audio_assistant_checkbox = tk.Checkbutton(control_panel, text="Enable Audio Assistant", variable=audio_assistant_enabled, font=("Arial", 12), bg="#ffffff", anchor="w")
 audio_assistant_checkbox.pack(pady=10, padx=10, fill=tk.X)
 
+roi_checkbox = tk.Checkbutton(control_panel, text="Hand ROI Mode", variable=roi_enabled, command=set_roi_mode, font=("Arial", 12), bg="#ffffff", anchor="w")
+roi_checkbox.pack(pady=5, padx=10, fill=tk.X)
+
+status_text = tk.StringVar(value="GUI: -- FPS | CPU: --%")
+status_label = tk.Label(control_panel, textvariable=status_text, font=("Arial", 10), fg="#555555", bg="#ffffff")
+status_label.pack(side=tk.BOTTOM, pady=10)
+
+# The detection thread never reads the Tk variable; the queue keeps its own flag
+audio_assistant_enabled.trace_add("write", lambda *args: speech.set_enabled(audio_assistant_enabled.get()))
+
+inference_text = tk.StringVar(value="Inference: -- FPS")
+inference_label = tk.Label(control_panel, textvariable=inference_text, font=("Arial", 10), fg="#555555", bg="#ffffff")
+inference_label.pack(side=tk.BOTTOM)
+
+renderer = TkRenderScheduler(root, video_label, fps=30, status_var=status_text, on_displayed=record_latency)
+renderer.start()
+
 root.mainloop()
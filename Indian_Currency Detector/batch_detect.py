@@ -0,0 +1,289 @@
+# Headless currency detection over image folders and video files:
+#
+#     python batch_detect.py clips/ notes.mp4 --output results.jsonl --annotate-dir annotated/
+#
+# Each input (a video file, an image file or a folder of images) is one job. Jobs
+# run in a process pool, one model per worker; inside a job frames are decoded on
+# a separate thread and passed to model.predict in batches. Each worker writes its
+# rows batch by batch to a part file next to the output, which is appended to the
+# JSONL or CSV results (picked from the output extension) when the job finishes,
+# so a long video never holds its detections in memory.
+import argparse
+import csv
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from currency_classes import label_for
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+FIELDS = ['source', 'frame', 'time', 'label', 'confidence', 'x1', 'y1', 'x2', 'y2']
+
+_model = None
+
+
+def _load_model(weights):
+    global _model
+    from ultralytics import YOLO
+    _model = YOLO(weights)
+
+
+def collect_jobs(paths):
+    jobs = []
+    for path in paths:
+        if os.path.isdir(path):
+            if any(name.lower().endswith(IMAGE_EXTENSIONS) for name in os.listdir(path)):
+                jobs.append(path)
+        elif path.lower().endswith(VIDEO_EXTENSIONS + IMAGE_EXTENSIONS):
+            jobs.append(path)
+        else:
+            print(f"Skipping unsupported input: {path}")
+    return jobs
+
+
+def iter_frames(source, stride=1):
+    # Yields (frame_index, timestamp_seconds, name, frame)
+    if os.path.isdir(source):
+        names = sorted(name for name in os.listdir(source) if name.lower().endswith(IMAGE_EXTENSIONS))
+        for index, name in enumerate(names[::stride]):
+            frame = cv2.imread(os.path.join(source, name))
+            if frame is not None:
+                yield index * stride, None, name, frame
+    elif source.lower().endswith(IMAGE_EXTENSIONS):
+        frame = cv2.imread(source)
+        if frame is not None:
+            yield 0, None, os.path.basename(source), frame
+    else:
+        cap = cv2.VideoCapture(source)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        index = 0
+        try:
+            while True:
+                if index % stride:
+                    if not cap.grab():
+                        break
+                else:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    yield index, index / fps, None, frame
+                index += 1
+        finally:
+            cap.release()
+
+
+def _decode(source, stride, frames, stop):
+    # Decoder thread: keeps the bounded queue full while the model is busy
+    try:
+        for item in iter_frames(source, stride):
+            while not stop.is_set():
+                try:
+                    frames.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                return
+    finally:
+        # The consumer may have stopped reading; never block on a full queue
+        while not stop.is_set():
+            try:
+                frames.put(None, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+
+
+def _annotate(frame, detections):
+    for label, conf, (x1, y1, x2, y2) in detections:
+        color = (0, 255, 0)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(frame, f"{label} ({conf:.2f})", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+
+
+class _AnnotatedWriter:
+    def __init__(self, source, annotate_dir):
+        self.source = source
+        self.annotate_dir = annotate_dir
+        self.video = None
+        self.is_video = not os.path.isdir(source) and source.lower().endswith(VIDEO_EXTENSIONS)
+        stem = os.path.splitext(os.path.basename(os.path.normpath(source)))[0]
+        self.target = os.path.join(annotate_dir, stem)
+        os.makedirs(annotate_dir if self.is_video else self.target, exist_ok=True)
+
+    def write(self, name, frame, fps):
+        if self.is_video:
+            if self.video is None:
+                height, width = frame.shape[:2]
+                self.video = cv2.VideoWriter(self.target + '_annotated.mp4',
+                                             cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+            self.video.write(frame)
+        else:
+            cv2.imwrite(os.path.join(self.target, name), frame)
+
+    def close(self):
+        if self.video is not None:
+            self.video.release()
+
+
+def process_source(source, part_path, batch_size=8, conf=0.6, stride=1, annotate_dir=None):
+    # Runs in a worker process; rows go to `part_path` after every batch.
+    # Returns (row_count, frames, seconds) for one input
+    frames = queue.Queue(maxsize=batch_size * 2)
+    stop = threading.Event()
+    decoder = threading.Thread(target=_decode, args=(source, stride, frames, stop), daemon=True)
+    started = time.perf_counter()
+    decoder.start()
+
+    writer = _AnnotatedWriter(source, annotate_dir) if annotate_dir else None
+    fps = 30.0
+    if writer and writer.is_video:
+        cap = cv2.VideoCapture(source)
+        fps = (cap.get(cv2.CAP_PROP_FPS) or 30) / stride
+        cap.release()
+
+    rows = ResultWriter(part_path, header=False)
+    row_total = 0
+    frame_total = 0
+    finished = False
+    try:
+        while not finished:
+            # Block for the first frame, then take whatever else is already decoded
+            item = frames.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < batch_size:
+                try:
+                    item = frames.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+
+            resized = [cv2.resize(frame, (480, 360)) for _, _, _, frame in batch]
+            results = _model.predict(resized, conf=conf, verbose=False)
+            frame_total += len(batch)
+
+            batch_rows = []
+            for (index, timestamp, name, frame), small, result in zip(batch, resized, results):
+                scale_x = frame.shape[1] / small.shape[1]
+                scale_y = frame.shape[0] / small.shape[0]
+                detections = []
+                for box in result.boxes:
+                    x1, y1, x2, y2 = map(float, box.xyxy[0])
+                    box_xyxy = (int(x1 * scale_x), int(y1 * scale_y), int(x2 * scale_x), int(y2 * scale_y))
+                    detections.append((label_for(int(box.cls[0])), float(box.conf[0]), box_xyxy))
+                for label, confidence, (x1, y1, x2, y2) in detections:
+                    batch_rows.append({
+                        'source': os.path.join(source, name) if name and os.path.isdir(source) else source,
+                        'frame': index,
+                        'time': round(timestamp, 3) if timestamp is not None else None,
+                        'label': label,
+                        'confidence': round(confidence, 4),
+                        'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2,
+                    })
+                if writer:
+                    _annotate(frame, detections)
+                    writer.write(name, frame, fps)
+            rows.write(batch_rows)
+            row_total += len(batch_rows)
+    finally:
+        stop.set()
+        rows.close()
+        if writer:
+            writer.close()
+
+    return row_total, frame_total, time.perf_counter() - started
+
+
+class ResultWriter:
+    def __init__(self, path, header=True):
+        self.path = path
+        self.is_csv = path.lower().endswith('.csv')
+        self.file = open(path, 'w', newline='' if self.is_csv else None, encoding='utf-8')
+        self.csv = csv.DictWriter(self.file, fieldnames=FIELDS) if self.is_csv else None
+        if self.csv and header:
+            self.csv.writeheader()
+
+    def write(self, rows):
+        for row in rows:
+            if self.csv:
+                self.csv.writerow(row)
+            else:
+                self.file.write(json.dumps(row) + '\n')
+        self.file.flush()
+
+    def append_part(self, part_path):
+        # Copies a worker's part file (same format, no header) onto the results
+        with open(part_path, newline='' if self.is_csv else None, encoding='utf-8') as part:
+            shutil.copyfileobj(part, self.file)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect Indian currency notes in image folders and video files.")
+    parser.add_argument('inputs', nargs='+', help="Video files, image files or folders of images")
+    parser.add_argument('--weights', default='weights/best.pt')
+    parser.add_argument('--output', default='results.jsonl', help="Results file (.jsonl or .csv)")
+    parser.add_argument('--annotate-dir', help="Write annotated videos/images here")
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=max(1, min(4, (os.cpu_count() or 2) // 2)),
+                        help="Worker processes (one model each)")
+    parser.add_argument('--conf', type=float, default=0.6)
+    parser.add_argument('--stride', type=int, default=1, help="Process every Nth video frame / image")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.weights):
+        parser.error(f"Model file not found at '{args.weights}'")
+    jobs = collect_jobs(args.inputs)
+    if not jobs:
+        parser.error("No supported inputs found")
+
+    writer = ResultWriter(args.output)
+    stem, ext = os.path.splitext(args.output)
+    parts = {job: f"{stem}.part{index}{ext}" for index, job in enumerate(jobs)}
+    total_frames, total_rows = 0, 0
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs)), initializer=_load_model,
+                                 initargs=(args.weights,)) as pool:
+            futures = {pool.submit(process_source, job, parts[job], args.batch_size, args.conf, args.stride,
+                                   args.annotate_dir): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    rows, frames, seconds = future.result()
+                    writer.append_part(parts[job])
+                except Exception as e:
+                    print(f"❌ {job}: {e}")
+                    continue
+                finally:
+                    if os.path.exists(parts[job]):
+                        os.remove(parts[job])
+                total_frames += frames
+                total_rows += rows
+                print(f"{job}: {frames} frames, {rows} detections, "
+                      f"{frames / seconds if seconds else 0:.1f} FPS")
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Processed {total_frames} frames from {len(jobs)} inputs in {elapsed:.1f}s "
+          f"({total_frames / elapsed if elapsed else 0:.1f} FPS), {total_rows} detections -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
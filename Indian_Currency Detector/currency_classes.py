@@ -0,0 +1,11 @@
+# Class order used when the currency model was trained
+currency_classes = [
+    '10 Rupees', '100 Rupees', '20 Rupees', '200 Rupees', '2000 Rupees',
+    '50 Rupees', '500 Rupees', 'new10 Rupees', 'new100 Rupees', 'new20 Rupees', 'new50 Rupees'
+]
+
+
+def label_for(cls_id):
+    if cls_id >= len(currency_classes):
+        return "Unknown Currency"
+    return currency_classes[cls_id]
@@ -1,12 +1,23 @@
 import tkinter as tk
 from tkinter import messagebox
 import threading
+import time
 import cv2
 from ultralytics import YOLO
-from PIL import Image, ImageTk
 import os
+import sys
 import pyttsx3
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.adaptive_skip import AdaptiveFrameSkipper
+from common.frame_pipeline import LatestFrameCapture
+from common.frame_sources import open_source
+from common.speech_queue import SpeechQueue
+from common.tk_render import TkRenderScheduler
+from currency_classes import currency_classes, label_for
+from note_counter import NoteCounter
+from note_tracker import NoteTracker
+
 model_path = "weights/best.pt"
 if not os.path.exists(model_path):
     messagebox.showerror("Error", f"Model file not found at '{model_path}'. Please check the path.")
@@ -14,36 +25,40 @@ if not os.path.exists(model_path):
 
 model = YOLO(model_path)
 
-currency_classes = [
-    '10 Rupees', '100 Rupees', '20 Rupees', '200 Rupees', '2000 Rupees',
-    '50 Rupees', '500 Rupees', 'new10 Rupees', 'new100 Rupees', 'new20 Rupees', 'new50 Rupees'
-]
-
 cap = None
+capture = None
 is_running = False
-frame_skip = 2
-frame_count = 0
+# Detector runs are paced by measured inference time rather than a fixed skip
+skipper = AdaptiveFrameSkipper(target_fps=15.0)
+tracker = NoteTracker(detect_every=3)
+counter = NoteCounter()
+counting_mode = False
 
-tts_engine = pyttsx3.init()
+# Speech runs on its own thread; on Windows the fixed vocabulary is pre-synthesized
+# once, in the background, when the audio assistant is first switched on
+speech = SpeechQueue(pyttsx3.init, cooldown=3.0, cache_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_cache"))
+speech.precache(currency_classes)
 
 def start_detection():
-    global cap, is_running
+    global cap, capture, is_running
     if is_running:
         messagebox.showinfo("Info", "Detection is already running.")
         return
 
-    if camera_source.get() == "Webcam":
-        cap = cv2.VideoCapture(0)
-    elif camera_source.get() == "Phone Camera":
-        ip_address = "http://192.168.187.193:4747/video"
-        cap = cv2.VideoCapture(ip_address)
-
-    if not cap.isOpened():
+    # Streams reconnect with backoff on their own; files and folders loop
+    spec = "0" if camera_source.get() == "Webcam" else source_address.get()
+    cap = open_source(spec)
+    if not cap.open():
         messagebox.showerror("Error", f"Could not open {camera_source.get()}.")
         return
 
+    # Frames are read on their own thread so camera latency overlaps inference
+    capture = LatestFrameCapture(cap)
+    capture.start()
+    skipper.reset()
+    tracker.reset()
     is_running = True
-    threading.Thread(target=run_detection, daemon=True).start()
+    threading.Thread(target=run_detection, args=(capture,), daemon=True).start()
 
 def stop_detection():
     global cap, is_running
@@ -52,82 +67,130 @@ def stop_detection():
         return
 
     is_running = False
-    if cap:
+    if capture:
+        capture.stop()
+        print(f"Capture stats: {capture.stats()}")
+    elif cap:
         cap.release()
     cv2.destroyAllWindows()
     messagebox.showinfo("Info", "Detection stopped.")
 
-def run_detection():
-    global cap, is_running, frame_count
-    while is_running:
-        ret, frame = cap.read()
-        frame_count += 0
-        if not ret:
-            print("❌ Error: Failed to capture frame")
-            stop_detection()
-            return
-
-        if frame_count % frame_skip != 0:
+def stop_if_current(source_capture):
+    # Runs on the Tk thread. A worker whose capture ended only stops detection if
+    # the user has not already stopped it, or started a new capture since
+    if is_running and capture is source_capture:
+        stop_detection()
+
+def run_detection(source_capture):
+    last_seq = 0
+    # The capture is passed in, so after a quick Stop -> Start this worker never
+    # picks up the new capture; it exits and leaves it to the new worker
+    while is_running and capture is source_capture:
+        pooled = source_capture.get(last_seq)
+        if pooled is None:
+            if not source_capture.running:
+                renderer.post('stop', lambda: stop_if_current(source_capture))
+                return
             continue
+        last_seq = pooled.seq
+
+        # Boxes are drawn straight into the pooled buffer; it is handed back once
+        # the display copy has been made
+        frame = pooled.array
+
+        # The full detector runs every few frames (or when a track gets uncertain)
+        # and only as often as this device can afford; the tracker's motion
+        # prediction covers the frames in between
+        if skipper.ready() and tracker.needs_detection():
+            started = time.perf_counter()
+            detections = detect_notes(frame)
+            skipper.record(started, time.perf_counter() - started)
+            tracks = tracker.update(detections)
+            renderer.post('inference', lambda summary=skipper.summary(): inference_text.set(summary))
+        else:
+            tracks = tracker.predict()
 
-        resized_frame = cv2.resize(frame, (480, 360))
-
-        results = model.predict(resized_frame, conf=0.6)
         detected_labels = []
-
-        for result in results:
-            for box in result.boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                conf = float(box.conf[0])
-                cls_id = int(box.cls[0])
-
-                if cls_id >= len(currency_classes):
-                    class_name = "Unknown Currency"
-                else:
-                    class_name = currency_classes[cls_id]
-
-                print(f"Detected: {class_name} with confidence {conf:.2f}")
-                detected_labels.append(class_name)
-
-                scale_x = frame.shape[1] / resized_frame.shape[1]
-                scale_y = frame.shape[0] / resized_frame.shape[0]
-                x1, x2 = int(x1 * scale_x), int(x2 * scale_x)
-                y1, y2 = int(y1 * scale_y), int(y2 * scale_y)
-
-                color = (0, 255, 0)
-                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                label = f"{class_name} ({conf:.2f})"
-                cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-
-        update_labels(detected_labels)
-
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(frame)
-        imgtk = ImageTk.PhotoImage(image=img)
-        video_label.imgtk = imgtk
-        video_label.configure(image=imgtk)
+        for track in tracks:
+            class_name, conf, _ = track.vote()
+            detected_labels.append(class_name)
+            x1, y1, x2, y2 = map(int, track.box)
+
+            color = (0, 255, 0)
+            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+            label = f"{class_name} ({conf:.2f})"
+            cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+
+        # Widgets are only touched from the Tk thread; the renderer picks these up
+        renderer.post('labels', lambda labels=detected_labels: update_labels(labels))
+        if counting_mode:
+            # Each physical note is added once; the total is spoken instead of every label
+            if counter.update(tracks, tracker.tracks):
+                announce_total()
+        else:
+            announce_labels(detected_labels)
+        renderer.submit(frame, pooled.captured_at)
+        pooled.release()
+
+def detect_notes(frame):
+    resized_frame = cv2.resize(frame, (480, 360))
+    scale_x = frame.shape[1] / resized_frame.shape[1]
+    scale_y = frame.shape[0] / resized_frame.shape[0]
+
+    results = model.predict(resized_frame, conf=0.6)
+    detections = []
+
+    for result in results:
+        for box in result.boxes:
+            x1, y1, x2, y2 = map(int, box.xyxy[0])
+            conf = float(box.conf[0])
+            label = label_for(int(box.cls[0]))
+
+            print(f"Detected: {label} with confidence {conf:.2f}")
+            detections.append(((x1 * scale_x, y1 * scale_y, x2 * scale_x, y2 * scale_y), label, conf))
+    return detections
+
+def record_latency(captured_at):
+    if capture:
+        capture.record_display(captured_at)
 
 def update_labels(labels):
     if labels:
         detected_text.set("\n".join(labels))
         detected_label.config(fg="green")
-        announce_labels(labels)
     else:
         detected_text.set("No currency detected")
         detected_label.config(fg="red")
 
 def announce_labels(labels):
-    if audio_assistant_enabled.get() and labels:
-        for label in labels:
-            tts_engine.say(label)
-        tts_engine.runAndWait()
+    # Only enqueues; repeats are collapsed and held back by the per-label cooldown
+    speech.announce(labels)
+
+def announce_total():
+    renderer.post('total', lambda total=counter.total: total_text.set(f"Total: ₹{total}"))
+    speech.announce([counter.spoken_total()], priority=1)
+
+def set_counting_mode():
+    global counting_mode
+    counting_mode = counting_enabled.get()
+
+def undo_note():
+    if counter.undo() is not None:
+        announce_total()
+
+def reset_total():
+    counter.reset()
+    announce_total()
 
 root = tk.Tk()
 root.title("Indian Currency Detector")
 root.configure(bg="#f0f0f0")
 
 camera_source = tk.StringVar(value="Webcam")
+# Phone stream URL, RTSP address, video file or image folder for the non-webcam options
+source_address = tk.StringVar(value="http://192.168.187.193:4747/video")
 audio_assistant_enabled = tk.BooleanVar(value=False)
+counting_enabled = tk.BooleanVar(value=False)
 
 header = tk.Frame(root, bg="#1e3d59", height=60)
 header.pack(fill=tk.X)
@@ -145,9 +208,11 @@ control_panel.pack(side=tk.RIGHT, fill=tk.Y, padx=10, pady=10)
 
 camera_label = tk.Label(control_panel, text="Select Camera Source:", font=("Arial", 14), bg="#ffffff")
 camera_label.pack(pady=10)
-camera_dropdown = tk.OptionMenu(control_panel, camera_source, "Webcam", "Phone Camera")
+camera_dropdown = tk.OptionMenu(control_panel, camera_source, "Webcam", "Phone Camera", "Video File / Folder")
 camera_dropdown.config(width=20, font=("Arial", 12), bg="#e0e0e0", fg="black")
 camera_dropdown.pack(pady=10)
+source_entry = tk.Entry(control_panel, textvariable=source_address, width=28, font=("Arial", 10))
+source_entry.pack(pady=(0, 10), padx=10)
 
 detected_text = tk.StringVar()
 detected_text.set("No currency detected")
@@ -169,4 +234,35 @@ audio_assistant_checkbox = tk.Checkbutton(
 )
 audio_assistant_checkbox.pack(pady=10, padx=10, fill=tk.X)
 
+counting_checkbox = tk.Checkbutton(
+    control_panel, text="Counting Mode", variable=counting_enabled, command=set_counting_mode,
+    font=("Arial", 12), bg="#ffffff", anchor="w"
+)
+counting_checkbox.pack(pady=5, padx=10, fill=tk.X)
+
+total_text = tk.StringVar(value="Total: ₹0")
+total_label = tk.Label(control_panel, textvariable=total_text, font=("Arial", 16, "bold"), fg="#1e3d59", bg="#ffffff")
+total_label.pack(pady=5)
+
+counting_buttons = tk.Frame(control_panel, bg="#ffffff")
+counting_buttons.pack(pady=5)
+undo_button = tk.Button(counting_buttons, text="Undo", command=undo_note, width=9, bg="#e0e0e0", font=("Arial", 11))
+undo_button.pack(side=tk.LEFT, padx=5)
+reset_button = tk.Button(counting_buttons, text="Reset", command=reset_total, width=9, bg="#e0e0e0", font=("Arial", 11))
+reset_button.pack(side=tk.LEFT, padx=5)
+
+status_text = tk.StringVar(value="GUI: -- FPS | CPU: --%")
+status_label = tk.Label(control_panel, textvariable=status_text, font=("Arial", 10), fg="#555555", bg="#ffffff")
+status_label.pack(side=tk.BOTTOM, pady=10)
+
+# The detection thread never reads the Tk variable; the queue keeps its own flag
+audio_assistant_enabled.trace_add("write", lambda *args: speech.set_enabled(audio_assistant_enabled.get()))
+
+inference_text = tk.StringVar(value="Inference: -- FPS")
+inference_label = tk.Label(control_panel, textvariable=inference_text, font=("Arial", 10), fg="#555555", bg="#ffffff")
+inference_label.pack(side=tk.BOTTOM)
+
+renderer = TkRenderScheduler(root, video_label, fps=30, status_var=status_text, on_displayed=record_latency)
+renderer.start()
+
 root.mainloop()
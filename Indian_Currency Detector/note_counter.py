@@ -0,0 +1,62 @@
+import re
+import threading
+
+
+def note_value(label):
+    # '100 Rupees' and 'new100 Rupees' are both worth 100; unknown labels are worth 0
+    match = re.search(r'\d+', label)
+    return int(match.group()) if match else 0
+
+
+class NoteCounter:
+    # Running total over physical notes. A note is counted once, when its track
+    # has been detected `min_hits` times with a settled label vote; later frames
+    # of the same track are ignored, so each update only looks at the active tracks.
+
+    def __init__(self, min_hits=3, min_vote_share=0.6):
+        self.min_hits = min_hits
+        self.min_vote_share = min_vote_share
+        self.total = 0
+        self.entries = []  # (track_id, label, value) in counting order
+        self._counted = set()
+        self._lock = threading.Lock()
+
+    def update(self, tracks, live_tracks=None):
+        # `tracks` are the confirmed tracks to count; `live_tracks` is every track
+        # the tracker still holds (NoteTracker.tracks), including ones coasting
+        # through a few missed detections. Forgetting a counted id while its track
+        # is only coasting would count the note again when it is re-detected.
+        added = []
+        with self._lock:
+            # Track ids are never reused, so ids of tracks that ended can be dropped
+            live = tracks if live_tracks is None else live_tracks
+            self._counted.intersection_update(track.track_id for track in live)
+            for track in tracks:
+                if track.track_id in self._counted or track.hits < self.min_hits:
+                    continue
+                label, _, share = track.vote()
+                value = note_value(label)
+                if share < self.min_vote_share or value == 0:
+                    continue
+                self._counted.add(track.track_id)
+                self.entries.append((track.track_id, label, value))
+                self.total += value
+                added.append((label, value))
+        return added
+
+    def undo(self):
+        with self._lock:
+            if not self.entries:
+                return None
+            # The note stays marked as counted so it is not re-added while still in view
+            track_id, label, value = self.entries.pop()
+            self.total -= value
+            return label, value
+
+    def reset(self):
+        with self._lock:
+            self.entries.clear()
+            self.total = 0
+
+    def spoken_total(self):
+        return f"Total {self.total} rupees"
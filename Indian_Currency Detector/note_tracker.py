@@ -0,0 +1,160 @@
+import itertools
+from collections import deque
+
+import numpy as np
+
+
+def iou(box_a, box_b):
+    x1, y1 = max(box_a[0], box_b[0]), max(box_a[1], box_b[1])
+    x2, y2 = min(box_a[2], box_b[2]), min(box_a[3], box_b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    if inter <= 0:
+        return 0.0
+    area_a = (box_a[2] - box_a[0]) * (box_a[3] - box_a[1])
+    area_b = (box_b[2] - box_b[0]) * (box_b[3] - box_b[1])
+    return inter / (area_a + area_b - inter)
+
+
+class NoteTrack:
+    # One physical note. The box centre and size follow a constant-velocity
+    # Kalman filter (one independent position/velocity filter per coordinate);
+    # the label is voted over the last `vote_window` detections, weighted by
+    # confidence, so it does not flicker between similar classes.
+
+    _ids = itertools.count(1)
+
+    def __init__(self, box, label, conf, vote_window=8, process_noise=1.0, measurement_noise=4.0):
+        self.track_id = next(NoteTrack._ids)
+        self.state = np.array(self._to_cxcywh(box) + [0.0, 0.0, 0.0, 0.0])
+        # Per-coordinate 2x2 covariance [[p_pos, p_cross], [p_cross, p_vel]]
+        self.cov = np.tile(np.array([[10.0, 0.0], [0.0, 100.0]]), (4, 1, 1))
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.votes = deque(maxlen=vote_window)
+        self.votes.append((label, conf))
+        self.hits = 1
+        self.misses = 0
+        self.age = 0
+
+    @staticmethod
+    def _to_cxcywh(box):
+        x1, y1, x2, y2 = box
+        return [(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1]
+
+    @property
+    def box(self):
+        cx, cy, w, h = self.state[:4]
+        return (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)
+
+    @property
+    def position_std(self):
+        return float(np.sqrt(self.cov[:2, 0, 0].max()))
+
+    def predict(self):
+        self.state[:4] += self.state[4:]
+        self.state[2:4] = np.maximum(self.state[2:4], 1.0)
+        p_pos, p_cross, p_vel = self.cov[:, 0, 0], self.cov[:, 0, 1], self.cov[:, 1, 1]
+        self.cov[:, 0, 0] = p_pos + 2 * p_cross + p_vel + self.process_noise
+        self.cov[:, 0, 1] = self.cov[:, 1, 0] = p_cross + p_vel
+        self.cov[:, 1, 1] = p_vel + self.process_noise
+        self.age += 1
+
+    def correct(self, box, label, conf):
+        measured = np.array(self._to_cxcywh(box))
+        residual = measured - self.state[:4]
+        p_pos, p_cross, p_vel = self.cov[:, 0, 0].copy(), self.cov[:, 0, 1].copy(), self.cov[:, 1, 1].copy()
+        innovation = p_pos + self.measurement_noise
+        gain_pos, gain_vel = p_pos / innovation, p_cross / innovation
+        self.state[:4] += gain_pos * residual
+        self.state[4:] += gain_vel * residual
+        self.cov[:, 0, 0] = (1 - gain_pos) * p_pos
+        self.cov[:, 0, 1] = self.cov[:, 1, 0] = (1 - gain_pos) * p_cross
+        self.cov[:, 1, 1] = p_vel - gain_vel * p_cross
+        self.votes.append((label, conf))
+        self.hits += 1
+        self.misses = 0
+
+    def vote(self):
+        # (label, mean confidence of that label, share of the total vote weight)
+        scores = {}
+        for label, conf in self.votes:
+            scores[label] = scores.get(label, 0.0) + conf
+        label = max(scores, key=scores.get)
+        count = sum(1 for vote_label, _ in self.votes if vote_label == label)
+        return label, scores[label] / count, scores[label] / sum(scores.values())
+
+
+class NoteTracker:
+    # IoU tracker over model.predict output. update() associates a fresh set of
+    # detections with the existing tracks; predict() advances every track on the
+    # frames in between, so the full detector only needs to run every
+    # `detect_every` frames or when a track becomes uncertain.
+
+    def __init__(self, iou_threshold=0.3, max_misses=5, min_hits=2, detect_every=3,
+                 vote_window=8, min_vote_share=0.6, max_position_std=20.0):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self.detect_every = detect_every
+        self.vote_window = vote_window
+        self.min_vote_share = min_vote_share
+        self.max_position_std = max_position_std
+        self.tracks = []
+        self.frames_since_detection = 0
+
+    def needs_detection(self):
+        if self.frames_since_detection + 1 >= self.detect_every:
+            return True
+        for track in self.tracks:
+            if track.position_std > self.max_position_std or track.vote()[2] < self.min_vote_share:
+                return True
+        return False
+
+    def update(self, detections):
+        # detections: [((x1, y1, x2, y2), label, conf)] in frame coordinates
+        self.frames_since_detection = 0
+        for track in self.tracks:
+            track.predict()
+
+        pairs = []
+        for track_index, track in enumerate(self.tracks):
+            track_box = track.box
+            for det_index, (box, _, _) in enumerate(detections):
+                overlap = iou(track_box, box)
+                if overlap >= self.iou_threshold:
+                    pairs.append((overlap, track_index, det_index))
+        pairs.sort(reverse=True)
+
+        matched_tracks, matched_dets = set(), set()
+        for _, track_index, det_index in pairs:
+            if track_index in matched_tracks or det_index in matched_dets:
+                continue
+            box, label, conf = detections[det_index]
+            self.tracks[track_index].correct(box, label, conf)
+            matched_tracks.add(track_index)
+            matched_dets.add(det_index)
+
+        for track_index, track in enumerate(self.tracks):
+            if track_index not in matched_tracks:
+                track.misses += 1
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_misses]
+
+        for det_index, (box, label, conf) in enumerate(detections):
+            if det_index not in matched_dets:
+                self.tracks.append(NoteTrack(box, label, conf, vote_window=self.vote_window))
+        return self.confirmed()
+
+    def predict(self):
+        self.frames_since_detection += 1
+        for track in self.tracks:
+            track.predict()
+        return self.confirmed()
+
+    def confirmed(self):
+        # Tracks seen at least `min_hits` times; a single missed detection run is
+        # bridged by prediction instead of making the box blink
+        return [track for track in self.tracks if track.hits >= self.min_hits and track.misses <= 1]
+
+    def reset(self):
+        self.tracks = []
+        self.frames_since_detection = 0
@@ -0,0 +1,105 @@
+import time
+from collections import deque
+
+
+class AdaptiveFrameSkipper:
+    # Decides which frames go through the model based on measured inference
+    # time instead of a fixed skip ratio. Inference starts at most every
+    # `interval` seconds: the target-FPS budget on fast machines, and stretched so
+    # inference keeps at most `max_busy` of the wall clock on slow ones, leaving
+    # time for capture and drawing.
+
+    def __init__(self, target_fps=15.0, max_busy=0.75, window=30):
+        self.target_fps = target_fps
+        self.max_busy = max_busy
+        self._latencies = deque(maxlen=window)
+        self._starts = deque(maxlen=window)
+        self._last_start = None
+        self._seen_since = 0
+        self.skip_ratio = 1.0
+
+    @property
+    def latency(self):
+        return sum(self._latencies) / len(self._latencies) if self._latencies else 0.0
+
+    @property
+    def interval(self):
+        return max(1.0 / self.target_fps, self.latency / self.max_busy)
+
+    @property
+    def effective_fps(self):
+        if len(self._starts) < 2 or self._starts[-1] == self._starts[0]:
+            return 0.0
+        return (len(self._starts) - 1) / (self._starts[-1] - self._starts[0])
+
+    def ready(self, now=None):
+        # Call once per captured frame; True when this one should be inferred
+        now = time.perf_counter() if now is None else now
+        self._seen_since += 1
+        # A millisecond of slack so frame-timing jitter does not cost a whole extra frame
+        return self._last_start is None or now - self._last_start >= self.interval - 0.001
+
+    def record(self, started, elapsed):
+        # Call after inference with its perf_counter start time and duration
+        self._last_start = started
+        self._starts.append(started)
+        self._latencies.append(elapsed)
+        # Smoothed "1 in N frames inferred"
+        self.skip_ratio = 0.8 * self.skip_ratio + 0.2 * self._seen_since
+        self._seen_since = 0
+
+    def reset(self):
+        self._latencies.clear()
+        self._starts.clear()
+        self._last_start = None
+        self._seen_since = 0
+        self.skip_ratio = 1.0
+
+    def summary(self):
+        return f"Inference: {self.effective_fps:.1f} FPS | 1:{self.skip_ratio:.1f} frames | {self.latency * 1000:.0f} ms"
+
+
+if __name__ == '__main__':
+    # Replay benchmark: python -m common.adaptive_skip <video> <weights> [target_fps]
+    # Feeds a recorded clip at its native frame rate and reports how far behind
+    # real time each inferred frame was, which should stay bounded on any device.
+    import sys
+
+    import cv2
+    from ultralytics import YOLO
+
+    video_path, weights = sys.argv[1], sys.argv[2]
+    skipper = AdaptiveFrameSkipper(target_fps=float(sys.argv[3]) if len(sys.argv) > 3 else 15.0)
+    model = YOLO(weights)
+    cap = cv2.VideoCapture(video_path)
+    frame_interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 30)
+
+    lags = []
+    replay_start = time.perf_counter()
+    frame_index = 0
+    while True:
+        # Jump to whichever frame a live camera would be showing right now
+        target_index = int((time.perf_counter() - replay_start) / frame_interval)
+        if target_index > frame_index:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, target_index)
+            frame_index = target_index
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame_time = replay_start + frame_index * frame_interval
+        frame_index += 1
+
+        if skipper.ready():
+            started = time.perf_counter()
+            model.predict(cv2.resize(frame, (480, 360)), verbose=False)
+            skipper.record(started, time.perf_counter() - started)
+            lags.append(time.perf_counter() - frame_time)
+        else:
+            time.sleep(max(0.0, frame_time + frame_interval - time.perf_counter()))
+
+    cap.release()
+    lags.sort()
+    if lags:
+        print(f"Inferred {len(lags)} of {frame_index} frames; {skipper.summary()}")
+        print(f"Capture-to-result lag p50 {lags[len(lags) // 2] * 1000:.0f} ms, "
+              f"p95 {lags[int(len(lags) * 0.95)] * 1000:.0f} ms, max {lags[-1] * 1000:.0f} ms")
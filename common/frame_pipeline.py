@@ -0,0 +1,305 @@
+import threading
+import time
+
+import numpy as np
+
+
+class PooledFrame:
+    # A frame living in one of the pool's preallocated buffers. Consumers work on
+    # `array` in place and call release() (or use `with`) when they are done so
+    # the capture thread can reuse the buffer.
+
+    __slots__ = ('array', 'seq', 'captured_at', '_slot', '_pool')
+
+    def __init__(self, array, seq, captured_at, slot, pool):
+        self.array = array
+        self.seq = seq
+        self.captured_at = captured_at
+        self._slot = slot
+        self._pool = pool
+
+    def release(self):
+        if self._pool is not None:
+            self._pool._release(self._slot)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class LatestFrameCapture:
+    # Reads a frame source (or cv2.VideoCapture) on its own thread, decoding straight into a small
+    # pool of preallocated buffers. Only the newest frame is kept: a frame nobody
+    # picked up before the next read is simply overwritten, so consumers never see
+    # stale driver-buffered frames and capture latency no longer stacks on inference.
+
+    def __init__(self, cap, pool_size=4, on_failure=None):
+        # One slot being written, one published and the rest held by consumers
+        self.cap = cap
+        self.pool_size = max(3, pool_size)
+        self.on_failure = on_failure
+        self.running = False
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self._buffers = []
+        self._refs = [0] * self.pool_size
+        self._latest = None  # (slot, seq, captured_at)
+        self._seq = 0
+        self._taken_seq = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._latency_count = 0
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        with self._cond:
+            self._cond.notify_all()
+        if hasattr(self.cap, 'interrupt'):
+            self.cap.interrupt()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        if self.cap is not None:
+            self.cap.release()
+
+    def get(self, last_seq=0, timeout=1.0):
+        # Newest frame newer than `last_seq`, or None on timeout/stop. The returned
+        # frame is pinned until released, so hold on to it only as long as needed.
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while self.running and (self._latest is None or self._latest[1] <= last_seq):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if self._latest is None or self._latest[1] <= last_seq:
+                return None
+            slot, seq, captured_at = self._latest
+            self._refs[slot] += 1
+            self._taken_seq = seq
+            return PooledFrame(self._buffers[slot], seq, captured_at, slot, self)
+
+    def record_display(self, captured_at):
+        # Called once a frame reached the screen: capture-to-display latency
+        latency = time.perf_counter() - captured_at
+        self._latency_total += latency
+        self._latency_max = max(self._latency_max, latency)
+        self._latency_count += 1
+
+    def stats(self):
+        count = self._latency_count
+        return {
+            'frames_captured': self.frames_captured,
+            'frames_dropped': self.frames_dropped,
+            'latency_ms_avg': round(self._latency_total / count * 1000, 1) if count else None,
+            'latency_ms_max': round(self._latency_max * 1000, 1) if count else None,
+        }
+
+    def _release(self, slot):
+        with self._cond:
+            self._refs[slot] -= 1
+
+    def _free_slot(self):
+        latest_slot = self._latest[0] if self._latest else None
+        for slot in range(len(self._buffers)):
+            if slot != latest_slot and self._refs[slot] == 0:
+                return slot
+        return None
+
+    def _allocate(self, frame):
+        # The first frame tells us the resolution; every later read decodes in place
+        self._buffers = [np.empty_like(frame) for _ in range(self.pool_size)]
+        self._buffers[0][...] = frame
+        return 0
+
+    def _capture_loop(self):
+        while self.running:
+            with self._cond:
+                slot = self._free_slot() if self._buffers else None
+
+            if not self._buffers:
+                ret, frame = self.cap.read()
+                if ret and frame is not None:
+                    slot = self._allocate(frame)
+            elif slot is None:
+                # Every buffer is pinned by a consumer: drain the driver instead of queueing
+                ret = self.cap.grab()
+                if ret:
+                    self.frames_dropped += 1
+                    continue
+            else:
+                buffer = self._buffers[slot]
+                ret, frame = self.cap.read(buffer)
+                if ret and frame is not None and frame is not buffer:
+                    # Resolution changed mid-stream, so this slot takes the new buffer
+                    self._buffers[slot] = frame
+
+            if not ret:
+                if self.running:
+                    print("❌ Error: Failed to capture frame")
+                self.running = False
+                with self._cond:
+                    self._cond.notify_all()
+                if self.on_failure:
+                    self.on_failure()
+                return
+
+            with self._cond:
+                if self._latest is not None and self._latest[1] > self._taken_seq:
+                    # The previous frame was never picked up
+                    self.frames_dropped += 1
+                self._seq += 1
+                self._latest = (slot, self._seq, time.perf_counter())
+                self.frames_captured += 1
+                self._cond.notify_all()
+
+
+class _ReplayCamera:
+    # Benchmark stand-in for a live camera: frames of a pre-decoded clip "arrive"
+    # at their wall-clock times into a driver queue of `buffers` slots that only
+    # drops new frames when full (like V4L2). Each frame carries its index in its
+    # first pixels so the display side can look up when it really was captured.
+
+    def __init__(self, frames, fps, buffers=4):
+        self.frames = frames
+        self.interval = 1.0 / fps
+        self.buffers = buffers
+        self.captured_at = []
+        self._queue = []
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._arrive, daemon=True)
+        self._thread.start()
+
+    def _arrive(self):
+        started = time.perf_counter()
+        for index in range(len(self.frames)):
+            delay = started + index * self.interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            with self._cond:
+                self.captured_at.append(time.perf_counter())
+                if len(self._queue) < self.buffers:
+                    self._queue.append(index)
+                self._cond.notify_all()
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def _next(self):
+        with self._cond:
+            while self._running and not self._queue:
+                self._cond.wait()
+            return self._queue.pop(0) if self._queue else None
+
+    def read(self, out=None):
+        index = self._next()
+        if index is None:
+            return False, None
+        frame = self.frames[index]
+        out = np.empty_like(frame) if out is None or out.shape != frame.shape else out
+        out[...] = frame
+        out.reshape(-1)[:4] = np.frombuffer(index.to_bytes(4, 'big'), np.uint8)
+        return True, out
+
+    def grab(self):
+        return self._next() is not None
+
+    def release(self):
+        pass
+
+    def frame_time(self, frame):
+        return self.captured_at[int.from_bytes(frame.reshape(-1)[:4].tobytes(), 'big')]
+
+
+if __name__ == '__main__':
+    # Before/after benchmark, from the repository root:
+    #     python -m common.frame_pipeline <video> [seconds] [weights]
+    # Replays the clip as a live camera and runs the old serial
+    # read -> infer -> display loop and the LatestFrameCapture path on it,
+    # reporting displayed FPS and glass-to-glass latency (camera arrival to
+    # display). Without weights, inference is a fixed 60 ms stand-in.
+    import sys
+
+    import cv2
+
+    video_path = sys.argv[1]
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    if len(sys.argv) > 3:
+        from ultralytics import YOLO
+        model = YOLO(sys.argv[3])
+        model.predict(np.zeros((360, 480, 3), np.uint8), verbose=False)
+
+        def infer(frame):
+            model.predict(cv2.resize(frame, (480, 360)), verbose=False)
+    else:
+        def infer(frame):
+            time.sleep(0.06)
+
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    clip = []
+    while len(clip) < int(seconds * fps):
+        ret, frame = cap.read()
+        if not ret:
+            if not clip:
+                sys.exit(f"Could not read {video_path}")
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            continue
+        clip.append(frame)
+    cap.release()
+
+    def display(frame):
+        # What the Tk renderer does with a frame: one RGB copy
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def report(name, latencies, elapsed):
+        latencies.sort()
+        print(f"{name:22s} {len(latencies) / elapsed:5.1f} FPS shown | glass-to-glass "
+              f"p50 {latencies[len(latencies) // 2] * 1000:6.0f} ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.0f} ms, max {latencies[-1] * 1000:6.0f} ms")
+
+    # Before: read, infer and display one frame after another on one thread
+    camera = _ReplayCamera(clip, fps)
+    latencies = []
+    started = time.perf_counter()
+    while True:
+        ret, frame = camera.read()
+        if not ret:
+            break
+        infer(frame)
+        display(frame)
+        latencies.append(time.perf_counter() - camera.frame_time(frame))
+    report("before: serial loop", latencies, time.perf_counter() - started)
+
+    # After: capture thread keeps only the newest frame in the buffer pool
+    camera = _ReplayCamera(clip, fps)
+    capture = LatestFrameCapture(camera)
+    latencies = []
+    started = time.perf_counter()
+    capture.start()
+    last_seq = 0
+    while True:
+        pooled = capture.get(last_seq)
+        if pooled is None:
+            if not capture.running:
+                break
+            continue
+        last_seq = pooled.seq
+        infer(pooled.array)
+        display(pooled.array)
+        latencies.append(time.perf_counter() - camera.frame_time(pooled.array))
+        pooled.release()
+    elapsed = time.perf_counter() - started
+    capture.stop()
+    report("after: LatestFrameCapture", latencies, elapsed)
+    print(f"Capture stats: {capture.stats()}")
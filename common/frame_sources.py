@@ -0,0 +1,279 @@
+import os
+import sys
+import threading
+import time
+
+import cv2
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+def default_backend():
+    # DirectShow opens webcams much faster on Windows; elsewhere let OpenCV choose
+    return cv2.CAP_DSHOW if sys.platform == 'win32' else cv2.CAP_ANY
+
+
+class FrameSource:
+    # A cv2.VideoCapture-compatible frame source (read/grab/isOpened/release), so
+    # the existing reader threads can consume any of them. Live sources reconnect
+    # with exponential backoff inside read(): a dropped network stream only
+    # stalls the reader thread, never the consumers of its latest frame.
+
+    reconnect = False
+
+    def __init__(self, spec, backoff_initial=0.5, backoff_max=8.0, max_retries=None):
+        self.spec = spec
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.max_retries = max_retries
+        self.frames_read = 0
+        self.read_failures = 0
+        self.reconnects = 0
+        self.last_frame_at = None
+        self._capture = None
+        self._closed = threading.Event()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.spec!r})"
+
+    def _open_capture(self):
+        raise NotImplementedError
+
+    def open(self):
+        self._closed.clear()
+        try:
+            self._capture = self._open_capture()
+        except Exception as e:
+            print(f"Error opening {self}: {e}")
+            self._capture = None
+        if self._capture is not None and not self._capture.isOpened():
+            self._capture.release()
+            self._capture = None
+        return self._capture is not None
+
+    def isOpened(self):
+        return self._capture is not None and self._capture.isOpened()
+
+    def read(self, out=None):
+        while not self._closed.is_set():
+            if self._capture is not None:
+                ret, frame = self._capture.read(out) if out is not None else self._capture.read()
+                if ret and frame is not None:
+                    self.frames_read += 1
+                    self.last_frame_at = time.time()
+                    return True, frame
+                self.read_failures += 1
+            if not self._recover():
+                return False, None
+        return False, None
+
+    def grab(self):
+        return self._capture is not None and self._capture.grab()
+
+    def interrupt(self):
+        # Wakes a reader blocked in backoff/pacing so it can exit before release()
+        self._closed.set()
+
+    def release(self):
+        self._closed.set()
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def stats(self):
+        return {
+            'source': str(self.spec),
+            'frames_read': self.frames_read,
+            'read_failures': self.read_failures,
+            'reconnects': self.reconnects,
+            'last_frame_age': round(time.time() - self.last_frame_at, 3) if self.last_frame_at else None,
+        }
+
+    def _recover(self):
+        if not self.reconnect:
+            return False
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+        delay = self.backoff_initial
+        attempt = 0
+        while not self._closed.is_set():
+            attempt += 1
+            if self.max_retries is not None and attempt > self.max_retries:
+                print(f"Giving up on {self} after {self.max_retries} reconnect attempts")
+                return False
+            print(f"Reconnecting to {self} in {delay:.1f}s (attempt {attempt})")
+            if self._closed.wait(delay):
+                return False
+            if self.open():
+                self.reconnects += 1
+                return True
+            delay = min(delay * 2, self.backoff_max)
+        return False
+
+
+class WebcamSource(FrameSource):
+    # 'auto' probes the first few indices, like the original camera start-up code
+    reconnect = True
+
+    def __init__(self, index='auto', width=None, height=None, fps=None, backend=None, **kwargs):
+        super().__init__(index, **kwargs)
+        self.width, self.height, self.fps = width, height, fps
+        self.backend = default_backend() if backend is None else backend
+        self.opened_index = None
+
+    def _open_capture(self):
+        indices = range(3) if self.spec == 'auto' else [int(self.spec)]
+        if self.opened_index is not None:
+            indices = [self.opened_index]
+        for index in indices:
+            print(f"Attempting to open camera at index {index}")
+            capture = cv2.VideoCapture(index, self.backend)
+            if capture.isOpened():
+                # Verify camera is working by reading a test frame
+                ret, test_frame = capture.read()
+                if ret and test_frame is not None:
+                    if self.width:
+                        capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+                    if self.height:
+                        capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+                    if self.fps:
+                        capture.set(cv2.CAP_PROP_FPS, self.fps)
+                    print(f"Opened camera {index} - Width: {capture.get(cv2.CAP_PROP_FRAME_WIDTH)}, "
+                          f"Height: {capture.get(cv2.CAP_PROP_FRAME_HEIGHT)}, FPS: {capture.get(cv2.CAP_PROP_FPS)}")
+                    self.opened_index = index
+                    return capture
+                print(f"Camera at index {index} opened but failed to read frame")
+            else:
+                print(f"Failed to open camera at index {index}")
+            capture.release()
+        return None
+
+
+class StreamSource(FrameSource):
+    # RTSP/HTTP streams such as an IP-webcam app on a phone
+    reconnect = True
+
+    def __init__(self, url, timeout_ms=5000, **kwargs):
+        super().__init__(url, **kwargs)
+        self.timeout_ms = timeout_ms
+
+    def _open_capture(self):
+        params = []
+        # Bound how long a dead stream can hold up open/read (OpenCV 4.5.2+)
+        for name in ('CAP_PROP_OPEN_TIMEOUT_MSEC', 'CAP_PROP_READ_TIMEOUT_MSEC'):
+            if hasattr(cv2, name):
+                params += [getattr(cv2, name), self.timeout_ms]
+        if params:
+            return cv2.VideoCapture(self.spec, cv2.CAP_FFMPEG, params)
+        return cv2.VideoCapture(self.spec)
+
+
+class VideoFileSource(FrameSource):
+    # Replays a recorded clip at its native frame rate, looping at the end, so
+    # the live pipeline can be exercised on a machine without a camera
+
+    def __init__(self, path, loop=True, realtime=True, **kwargs):
+        super().__init__(path, **kwargs)
+        self.loop = loop
+        self.realtime = realtime
+        self._interval = 0.0
+        self._next_at = None
+
+    def _open_capture(self):
+        if not os.path.exists(self.spec):
+            raise FileNotFoundError(f"Video source not found: {self.spec}")
+        capture = cv2.VideoCapture(self.spec)
+        self._interval = 1.0 / (capture.get(cv2.CAP_PROP_FPS) or 30) if self.realtime else 0.0
+        return capture
+
+    def read(self, out=None):
+        if self._interval:
+            now = time.perf_counter()
+            if self._next_at is not None and self._next_at > now:
+                self._closed.wait(self._next_at - now)
+            self._next_at = max(now, self._next_at or now) + self._interval
+        ret, frame = super().read(out)
+        if not ret and self.loop and self._capture is not None and not self._closed.is_set():
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = super().read(out)
+        return ret, frame
+
+
+class ImageDirSource(FrameSource):
+    # Plays a folder of images as a stream at `fps`, looping by default
+
+    def __init__(self, path, fps=10.0, loop=True, **kwargs):
+        super().__init__(path, **kwargs)
+        self.fps = fps
+        self.loop = loop
+        self._names = []
+        self._position = 0
+        self._next_at = None
+
+    def _open_capture(self):
+        return None
+
+    def open(self):
+        self._closed.clear()
+        if not os.path.isdir(self.spec):
+            print(f"Error opening {self}: not a directory")
+            return False
+        self._names = sorted(name for name in os.listdir(self.spec) if name.lower().endswith(IMAGE_EXTENSIONS))
+        self._position = 0
+        return bool(self._names)
+
+    def isOpened(self):
+        return bool(self._names) and not self._closed.is_set()
+
+    def read(self, out=None):
+        while self.isOpened():
+            if self._position >= len(self._names):
+                if not self.loop:
+                    return False, None
+                self._position = 0
+            now = time.perf_counter()
+            if self._next_at is not None and self._next_at > now:
+                self._closed.wait(self._next_at - now)
+            self._next_at = max(now, self._next_at or now) + 1.0 / self.fps
+
+            frame = cv2.imread(os.path.join(self.spec, self._names[self._position]))
+            self._position += 1
+            if frame is None:
+                self.read_failures += 1
+                continue
+            if out is not None and out.shape == frame.shape:
+                out[...] = frame
+                frame = out
+            self.frames_read += 1
+            self.last_frame_at = time.time()
+            return True, frame
+        return False, None
+
+    def grab(self):
+        self._position += 1
+        return self.isOpened()
+
+    def release(self):
+        self._closed.set()
+
+
+def open_source(spec, **kwargs):
+    # Builds a source from a config string: a camera index or 'auto', an
+    # rtsp://, http(s):// URL, a video file, or a folder of images.
+    # Keyword arguments that do not apply to the chosen kind are ignored.
+    spec = str(spec).strip()
+
+    def pick(cls, *names):
+        common = ('backoff_initial', 'backoff_max', 'max_retries')
+        return cls, {key: value for key, value in kwargs.items() if key in names + common}
+
+    if spec == 'auto' or spec.isdigit():
+        cls, options = pick(WebcamSource, 'width', 'height', 'fps', 'backend')
+    elif '://' in spec:
+        cls, options = pick(StreamSource, 'timeout_ms')
+    elif os.path.isdir(spec):
+        cls, options = pick(ImageDirSource, 'fps', 'loop')
+    else:
+        cls, options = pick(VideoFileSource, 'loop', 'realtime')
+    return cls(spec, **options)
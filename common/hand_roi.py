@@ -0,0 +1,171 @@
+import threading
+import time
+
+import cv2
+
+try:
+    import mediapipe as mp
+except ImportError:
+    mp = None
+
+
+def pad_box(box, frame_shape, pad=0.3, min_size=96):
+    # Grow a hand box by `pad` of its larger side and make it square, so the
+    # whole gesture (fingers, wrist) fits even when the landmarks are tight
+    height, width = frame_shape[:2]
+    x1, y1, x2, y2 = box
+    side = max(x2 - x1, y2 - y1) * (1 + 2 * pad)
+    side = min(max(side, min_size), width, height)
+    cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+    x1 = int(min(max(cx - side / 2, 0), width - side))
+    y1 = int(min(max(cy - side / 2, 0), height - side))
+    return x1, y1, int(x1 + side), int(y1 + side)
+
+
+def merge_boxes(boxes):
+    # Overlapping crops are merged so one hand is never inferred (and counted) twice
+    merged = []
+    for box in sorted(boxes):
+        for index, other in enumerate(merged):
+            if box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]:
+                merged[index] = (min(box[0], other[0]), min(box[1], other[1]),
+                                 max(box[2], other[2]), max(box[3], other[3]))
+                break
+        else:
+            merged.append(box)
+    return merged
+
+
+class HandLocator:
+    # Cheap first stage: MediaPipe Hands on a downscaled copy of the frame,
+    # returning one box per hand in full-frame pixel coordinates.
+
+    def __init__(self, max_hands=2, min_detection_confidence=0.5, detect_width=320):
+        self.detect_width = detect_width
+        self.available = mp is not None
+        self._hands = None
+        if self.available:
+            self._hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=max_hands,
+                                                   min_detection_confidence=min_detection_confidence)
+        self._lock = threading.Lock()
+
+    def locate(self, frame):
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.detect_width / width)
+        small = cv2.resize(frame, (int(width * scale), int(height * scale))) if scale < 1.0 else frame
+        rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+        with self._lock:
+            results = self._hands.process(rgb)
+
+        boxes = []
+        for hand_landmarks in results.multi_hand_landmarks or []:
+            x_coords = [lm.x for lm in hand_landmarks.landmark]
+            y_coords = [lm.y for lm in hand_landmarks.landmark]
+            boxes.append((min(x_coords) * width, min(y_coords) * height,
+                          max(x_coords) * width, max(y_coords) * height))
+        return boxes
+
+
+class RoiInference:
+    # Two-stage detection: the hand locator proposes regions and YOLO only runs
+    # on padded crops of them at a smaller `imgsz`, with boxes mapped back to the
+    # frame. Frames without hands skip YOLO entirely. Without MediaPipe,
+    # `available` is False and callers keep using full-frame inference.
+
+    def __init__(self, imgsz=320, pad=0.3, locator=None):
+        self.imgsz = imgsz
+        self.pad = pad
+        self.locator = locator or HandLocator()
+        self.available = self.locator.available
+        self.frames = 0
+        self.crops = 0
+        self.empty_frames = 0
+
+    def predict(self, model, frame, **predict_kwargs):
+        # [(x1, y1, x2, y2, cls_id, conf)] in frame coordinates
+        self.frames += 1
+        regions = merge_boxes([pad_box(box, frame.shape, self.pad) for box in self.locator.locate(frame)])
+        if not regions:
+            self.empty_frames += 1
+            return []
+
+        self.crops += len(regions)
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in regions]
+        results = model.predict(crops, imgsz=self.imgsz, verbose=False, **predict_kwargs)
+
+        detections = []
+        for (offset_x, offset_y, _, _), result in zip(regions, results):
+            boxes = result.boxes
+            for (x1, y1, x2, y2), cls, conf in zip(boxes.xyxy.tolist(), boxes.cls.tolist(), boxes.conf.tolist()):
+                detections.append((x1 + offset_x, y1 + offset_y, x2 + offset_x, y2 + offset_y, int(cls), conf))
+        return detections
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'crops_per_frame': round(self.crops / self.frames, 2) if self.frames else 0.0,
+            'frames_without_hands': self.empty_frames,
+        }
+
+
+def full_frame_predict(model, frame, **predict_kwargs):
+    result = model.predict(frame, verbose=False, **predict_kwargs)[0]
+    boxes = result.boxes
+    return [(x1, y1, x2, y2, int(cls), conf)
+            for (x1, y1, x2, y2), cls, conf in zip(boxes.xyxy.tolist(), boxes.cls.tolist(), boxes.conf.tolist())]
+
+
+def _iou(a, b):
+    x1, y1, x2, y2 = max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+if __name__ == '__main__':
+    # Benchmark: python -m common.hand_roi <video> <weights> [roi_imgsz]
+    # Runs full-frame and ROI inference on every frame of a recorded clip and
+    # reports mean latency of each, plus how many full-frame detections the ROI
+    # mode reproduces (same class, IoU >= 0.5) and how many extra it adds.
+    import sys
+
+    from ultralytics import YOLO
+
+    video_path, weights = sys.argv[1], sys.argv[2]
+    model = YOLO(weights)
+    roi = RoiInference(imgsz=int(sys.argv[3]) if len(sys.argv) > 3 else 320)
+    if not roi.available:
+        sys.exit("mediapipe is not installed")
+
+    cap = cv2.VideoCapture(video_path)
+    full_time = roi_time = 0.0
+    full_total = matched = roi_total = frames = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames += 1
+
+        started = time.perf_counter()
+        reference = full_frame_predict(model, frame, conf=0.5)
+        full_time += time.perf_counter() - started
+
+        started = time.perf_counter()
+        candidate = roi.predict(model, frame, conf=0.5)
+        roi_time += time.perf_counter() - started
+
+        full_total += len(reference)
+        roi_total += len(candidate)
+        unmatched = list(candidate)
+        for det in reference:
+            match = next((c for c in unmatched if c[4] == det[4] and _iou(c, det) >= 0.5), None)
+            if match is not None:
+                unmatched.remove(match)
+                matched += 1
+    cap.release()
+
+    if frames:
+        print(f"{frames} frames | full-frame {full_time / frames * 1000:.1f} ms | "
+              f"ROI {roi_time / frames * 1000:.1f} ms ({roi.stats()})")
+        print(f"ROI reproduced {matched}/{full_total} full-frame detections, "
+              f"{roi_total - matched} additional")
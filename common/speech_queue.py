@@ -0,0 +1,210 @@
+import heapq
+import os
+import re
+import threading
+import time
+import wave
+
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
+
+class SpeechQueue:
+    # Text-to-speech on a background thread so announcing never blocks detection.
+    # announce() only enqueues: labels repeated within a frame are collapsed, a
+    # label is not repeated within its cooldown, the queue is bounded (lowest
+    # priority/oldest entries are dropped first) and entries older than `max_age`
+    # are skipped as stale. A higher-priority label interrupts the current one.
+    #
+    # With `cache_dir` set, a fixed vocabulary can be pre-synthesized to WAV files
+    # once and played back directly (Windows), skipping synthesis on every announcement.
+
+    def __init__(self, engine_factory, cooldown=3.0, max_pending=4, max_age=2.0, cache_dir=None):
+        self.engine_factory = engine_factory
+        self.cooldown = cooldown
+        self.max_pending = max_pending
+        self.max_age = max_age
+        self.cache_dir = cache_dir
+        self.enabled = False
+        self.spoken = 0
+        self.dropped = 0
+        self._heap = []
+        self._seq = 0
+        self._last_spoken = {}
+        self._cache = {}  # label -> (wav path, seconds)
+        self._speaking = None  # (priority, label)
+        self._interrupt = False
+        self._precache = []
+        self._deferred = []  # Vocabulary waiting for speech to be enabled
+        self._running = True
+        self._engine = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def set_enabled(self, enabled):
+        with self._cond:
+            self.enabled = enabled
+            if enabled and self._deferred:
+                self._queue_deferred()
+            if not enabled:
+                self._heap.clear()
+                self._interrupt = self._speaking is not None
+                self._stop_playback()
+
+    def announce(self, labels, priority=0):
+        if not self.enabled or not labels:
+            return
+        now = time.time()
+        with self._cond:
+            pending = {entry[3] for entry in self._heap}
+            for label in dict.fromkeys(labels):
+                if label in pending or now - self._last_spoken.get(label, 0) < self.cooldown:
+                    continue
+                if self._speaking and self._speaking[1] == label:
+                    continue
+                self._seq += 1
+                heapq.heappush(self._heap, (-priority, now, self._seq, label))
+                pending.add(label)
+                if self._speaking and priority > self._speaking[0]:
+                    self._interrupt = True
+                    self._stop_playback()
+            while len(self._heap) > self.max_pending:
+                # Drop the lowest-priority, oldest entry rather than letting speech lag
+                worst = max(self._heap, key=lambda entry: (entry[0], -entry[1]))
+                self._heap.remove(worst)
+                heapq.heapify(self._heap)
+                self.dropped += 1
+            self._cond.notify()
+
+    def precache(self, vocabulary):
+        # Synthesized on the speech thread, which owns the engine, once speech is
+        # first enabled. Cached WAVs are only ever played through winsound, so
+        # elsewhere this is a no-op rather than synthesis nothing would use.
+        if not self.cache_dir or winsound is None:
+            return
+        with self._cond:
+            self._deferred.extend(vocabulary)
+            if self.enabled:
+                self._queue_deferred()
+
+    def _queue_deferred(self):
+        self._precache.extend(self._deferred)
+        self._deferred = []
+        self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._heap.clear()
+            self._stop_playback()
+        self._thread.join(timeout=2.0)
+
+    def _cache_path(self, label):
+        return os.path.join(self.cache_dir, re.sub(r'[^A-Za-z0-9_-]+', '_', label) + '.wav')
+
+    def _build_cache(self, vocabulary):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        missing = []
+        for label in vocabulary:
+            path = self._cache_path(label)
+            seconds = self._wav_seconds(path) if os.path.exists(path) else None
+            if seconds is not None:
+                self._cache[label] = (path, seconds)
+            else:
+                self._engine.save_to_file(label, path)
+                missing.append((label, path))
+        if missing:
+            self._engine.runAndWait()
+        for label, path in missing:
+            seconds = self._wav_seconds(path) if os.path.exists(path) else None
+            if seconds is not None:
+                self._cache[label] = (path, seconds)
+
+    def _on_word(self, name, location, length):
+        # pyttsx3 only honours stop() from inside its own callbacks
+        if self._interrupt:
+            self._engine.stop()
+
+    @staticmethod
+    def _wav_seconds(path):
+        # Clip length, or None for a file left unreadable by an interrupted save
+        try:
+            with wave.open(path, 'rb') as wav:
+                return wav.getnframes() / float(wav.getframerate() or 1)
+        except (wave.Error, EOFError, OSError):
+            return None
+
+    def _stop_playback(self):
+        # Called with the lock held. Cached clips play asynchronously, and
+        # PlaySound(None, 0) stops the current one (SND_PURGE is not supported
+        # on modern Windows); the notify wakes the speech thread waiting on it.
+        if winsound is not None and self._speaking and self._speaking[1] in self._cache:
+            winsound.PlaySound(None, 0)
+        self._cond.notify_all()
+
+    def _play_cached(self, path, seconds):
+        # Returns once the clip has finished or was interrupted/stopped
+        winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+        deadline = time.perf_counter() + seconds
+        with self._cond:
+            while self._running and not self._interrupt:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+    def _next(self):
+        with self._cond:
+            while self._running and not self._heap and not self._precache:
+                self._cond.wait()
+            if not self._running:
+                return None, None
+            if self._precache:
+                vocabulary, self._precache = self._precache, []
+                return None, vocabulary
+            now = time.time()
+            while self._heap:
+                neg_priority, enqueued_at, _, label = heapq.heappop(self._heap)
+                if now - enqueued_at <= self.max_age:
+                    self._speaking = (-neg_priority, label)
+                    self._interrupt = False
+                    self._last_spoken[label] = now
+                    return label, None
+                self.dropped += 1
+            return None, None
+
+    def _run(self):
+        try:
+            self._engine = self.engine_factory()
+            self._engine.connect('started-word', self._on_word)
+        except Exception as e:
+            print(f"Text-to-speech unavailable: {e}")
+            return
+
+        while self._running:
+            label, vocabulary = self._next()
+            if vocabulary:
+                try:
+                    self._build_cache(vocabulary)
+                except Exception as e:
+                    print(f"Speech cache error: {e}")
+                continue
+            if label is None:
+                continue
+            try:
+                cached = self._cache.get(label)
+                if cached and winsound is not None:
+                    self._play_cached(*cached)
+                else:
+                    self._engine.say(label)
+                    self._engine.runAndWait()
+                self.spoken += 1
+            except Exception as e:
+                print(f"Speech error: {e}")
+            finally:
+                with self._cond:
+                    self._speaking = None
+                    self._last_spoken[label] = time.time()
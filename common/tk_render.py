@@ -0,0 +1,103 @@
+import threading
+import time
+
+import cv2
+from PIL import Image, ImageTk
+
+
+class TkRenderScheduler:
+    # Moves every widget update onto the Tk main loop. Worker threads hand over
+    # their newest annotated frame and GUI callbacks; a root.after() tick applies
+    # them at the display rate, dropping whatever was superseded in between. One
+    # PhotoImage is reused via paste() as long as the display size is unchanged.
+
+    def __init__(self, root, video_label, fps=30, status_var=None, on_displayed=None):
+        self.root = root
+        self.video_label = video_label
+        self.interval_ms = max(1, int(1000 / fps))
+        self.status_var = status_var
+        self.on_displayed = on_displayed
+        self.frames_shown = 0
+        self._photo = None
+        self._photo_size = None
+        self._pending_frame = None
+        self._pending_calls = {}
+        self._lock = threading.Lock()
+        self._target_size = None
+        self._window_start = time.perf_counter()
+        self._window_cpu = time.process_time()
+        self._window_frames = 0
+
+        video_label.bind("<Configure>", self._on_resize)
+
+    def start(self):
+        self.root.after(self.interval_ms, self._tick)
+
+    def submit(self, frame, captured_at=None):
+        # Called from the worker thread with a BGR frame. Scaling to the visible
+        # widget size and the colour conversion happen here, off the GUI thread,
+        # and produce a new array, so the caller may reuse `frame` right away.
+        frame_height, frame_width = frame.shape[:2]
+        target = self._target_size
+        if target:
+            scale = min(target[0] / frame_width, target[1] / frame_height)
+            size = (max(1, int(frame_width * scale)), max(1, int(frame_height * scale)))
+            if size != (frame_width, frame_height):
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        with self._lock:
+            self._pending_frame = (rgb, captured_at)
+
+    def post(self, key, callback):
+        # Run `callback` on the Tk thread at the next tick; a newer call with the
+        # same key replaces one that has not run yet
+        with self._lock:
+            self._pending_calls[key] = callback
+
+    def _on_resize(self, event):
+        # Leave room for the label border so the image does not force a regrow
+        border = 2 * (int(self.video_label.cget("bd")) + int(self.video_label.cget("highlightthickness")))
+        width, height = event.width - border, event.height - border
+        self._target_size = (width, height) if width > 1 and height > 1 else None
+
+    def _tick(self):
+        with self._lock:
+            pending, self._pending_frame = self._pending_frame, None
+            calls, self._pending_calls = self._pending_calls, {}
+
+        for callback in calls.values():
+            try:
+                callback()
+            except Exception as e:
+                print(f"GUI update error: {e}")
+
+        if pending is not None:
+            rgb, captured_at = pending
+            self._show(rgb)
+            if self.on_displayed and captured_at is not None:
+                self.on_displayed(captured_at)
+
+        self._update_status()
+        self.root.after(self.interval_ms, self._tick)
+
+    def _show(self, rgb):
+        img = Image.fromarray(rgb)
+        if self._photo is not None and self._photo_size == img.size:
+            self._photo.paste(img)
+        else:
+            self._photo = ImageTk.PhotoImage(image=img)
+            self._photo_size = img.size
+            self.video_label.configure(image=self._photo)
+        self.frames_shown += 1
+        self._window_frames += 1
+
+    def _update_status(self):
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        if elapsed < 1.0 or self.status_var is None:
+            return
+        cpu = time.process_time()
+        fps = self._window_frames / elapsed
+        cpu_percent = (cpu - self._window_cpu) / elapsed * 100
+        self.status_var.set(f"GUI: {fps:.1f} FPS | CPU: {cpu_percent:.0f}%")
+        self._window_start, self._window_cpu, self._window_frames = now, cpu, 0